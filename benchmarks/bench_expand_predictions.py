@@ -0,0 +1,64 @@
+"""
+윈도우 알람 -> 프레임 알람 확장 속도 비교 벤치마크
+
+기존 EventDetector._expand_predictions의 pandas .loc 슬라이싱 방식과
+pia_bench.intervals.expand_window_alarms의 np.repeat 방식을 비교합니다.
+
+실행:
+    python -m benchmarks.bench_expand_predictions
+"""
+import time
+import numpy as np
+import pandas as pd
+from pia_bench.intervals import expand_window_alarms
+
+FRAME_INTERVAL = 15
+EVENTS = ['falldown', 'violence', 'fire']
+
+
+def legacy_expand(window_alarms: np.ndarray, total_frames: int) -> pd.DataFrame:
+    """기존 .loc 기반 확장 (비교 기준)"""
+    df = pd.DataFrame({'frame': range(total_frames)})
+    for category in EVENTS:
+        df[category] = 0
+    num_windows = len(window_alarms)
+    for i in range(num_windows):
+        current_frame = i * FRAME_INTERVAL
+        next_frame = (i + 1) * FRAME_INTERVAL if i + 1 < num_windows else total_frames
+        for category_idx, category in enumerate(EVENTS):
+            df.loc[current_frame:next_frame-1, category] = window_alarms[i, category_idx]
+    return df
+
+
+def vectorized_expand(window_alarms: np.ndarray, total_frames: int) -> pd.DataFrame:
+    """np.repeat 기반 확장"""
+    df = pd.DataFrame(expand_window_alarms(window_alarms, total_frames, FRAME_INTERVAL), columns=EVENTS)
+    df.insert(0, 'frame', np.arange(total_frames))
+    return df
+
+
+def run_benchmark(frame_counts=(1800, 9000, 18000), repeat: int = 3):
+    rng = np.random.default_rng(0)
+    for total_frames in frame_counts:
+        num_windows = -(-total_frames // FRAME_INTERVAL)
+        window_alarms = rng.integers(0, 2, size=(num_windows, len(EVENTS)), dtype=np.uint8)
+
+        timings = {}
+        for name, fn in [('legacy', legacy_expand), ('vectorized', vectorized_expand)]:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = fn(window_alarms, total_frames)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = (best, result)
+
+        legacy_time, legacy_df = timings['legacy']
+        fast_time, fast_df = timings['vectorized']
+        same = np.array_equal(legacy_df[EVENTS].values, fast_df[EVENTS].values)
+        print(f"frames={total_frames:>6} windows={num_windows:>5} "
+              f"legacy={legacy_time * 1000:9.2f}ms vectorized={fast_time * 1000:7.2f}ms "
+              f"speedup={legacy_time / fast_time:8.1f}x identical={same}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,59 @@
+"""
+수집(ingestion) 파이프라인 처리량 벤치마크
+
+비디오를 하나씩 SampledFrameReader로 읽고 인코딩하는 순차 방식과
+pia_bench.ingest.IngestPipeline(디코더 프로세스 풀 + 공유 메모리 링 버퍼)을 비교합니다.
+인코더는 모델 없이 StubEncoder를 사용하며, 테스트 비디오는 임시 폴더에 합성합니다.
+
+실행:
+    python -m benchmarks.bench_ingest
+"""
+import os
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_video_reader import make_video
+from pia_bench.ingest import IngestPipeline, StubEncoder
+from pia_bench.video_reader import SampledFrameReader
+
+VIDEO_CFG = {'time_sampling': 15}
+BATCH_SIZE = 32
+
+
+def serial_ingest(video_paths, encoder):
+    results = {}
+    for video_path in video_paths:
+        frame_indices, frames = SampledFrameReader.from_config(video_path, VIDEO_CFG).read_all()
+        results[video_path] = (frame_indices, encoder(frames))
+    return results
+
+
+def run_benchmark(num_videos: int = 8, resolution=(1280, 720), num_frames: int = 300):
+    encoder = StubEncoder()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_paths = []
+        for i in range(num_videos):
+            path = os.path.join(tmp_dir, f"video_{i}.mp4")
+            make_video(path, *resolution, num_frames)
+            video_paths.append(path)
+        total = num_videos * num_frames
+
+        start = time.perf_counter()
+        serial = serial_ingest(video_paths, encoder)
+        serial_time = time.perf_counter() - start
+        print(f"serial      : {total / serial_time:7.1f} frames/s")
+
+        for num_decoders in sorted({1, 2, 4, os.cpu_count() or 1}):
+            pipeline = IngestPipeline(video_paths, VIDEO_CFG, encoder, num_decoders=num_decoders,
+                                      batch_size=BATCH_SIZE)
+            start = time.perf_counter()
+            pipelined = {path: (indices, embeddings) for path, indices, embeddings in pipeline.run()}
+            elapsed = time.perf_counter() - start
+            same = all(np.array_equal(serial[p][0], pipelined[p][0])
+                       and np.allclose(serial[p][1], pipelined[p][1], atol=1e-3) for p in video_paths)
+            print(f"decoders={num_decoders:<3}: {total / elapsed:7.1f} frames/s "
+                  f"({serial_time / elapsed:4.2f}x, identical={same})")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,89 @@
+"""
+스트리밍 알람 처리량/지연 벤치마크
+
+StreamAlarmer로 여러 스트림을 동시에 처리할 때의 윈도우 처리량과
+배치 크기별 처리 지연을 측정하고, 결과 알람 구간이 배치 모드(AlarmEngine.compute)와 같은지 확인합니다.
+
+실행:
+    python -m benchmarks.bench_stream
+"""
+import time
+import numpy as np
+from pia_bench.alarm_engine import AlarmEngine
+from pia_bench.event_alarm import FRAME_INTERVAL, numpy_similarity
+from pia_bench.intervals import window_alarm_runs
+from pia_bench.stream import StreamAlarmer
+
+DIM = 512
+EVENTS = ['falldown', 'violence', 'fire']
+PROMPTS_PER_STATUS = 5
+
+
+def build_engine() -> AlarmEngine:
+    config = {'PROMPT_CFG': [
+        {'event': event, 'top_candidates': 3, 'alert_threshold': 2,
+         'prompts': {status: [{'sentence': f"{event} {status} {i}"} for i in range(PROMPTS_PER_STATUS)]
+                     for status in ['normal', 'abnormal']}}
+        for event in EVENTS
+    ]}
+    return AlarmEngine.from_config(config)
+
+
+def make_streams(num_streams: int, num_windows: int, rng: np.random.Generator):
+    return {f"stream{i}": rng.standard_normal((num_windows, 1, DIM)).astype(np.float32) for i in range(num_streams)}
+
+
+def interleaved_feed(streams):
+    num_windows = len(next(iter(streams.values())))
+    for position in range(num_windows):
+        for stream_id, vectors in streams.items():
+            yield stream_id, vectors[position]
+    for stream_id in streams:
+        yield stream_id, None
+
+
+def transitions_to_runs(transitions, events):
+    runs = {}
+    opened = {}
+    for t in transitions:
+        key = (t.stream_id, t.event)
+        if t.alarm:
+            opened[key] = t.frame
+        else:
+            runs.setdefault(key, []).append((opened.pop(key), t.frame))
+    return runs
+
+
+def run_benchmark(stream_counts=(10, 100, 500), num_windows: int = 120, batch_sizes=(1, 64, 512)):
+    rng = np.random.default_rng(0)
+    engine = build_engine()
+    text_vectors = rng.standard_normal((len(engine.events) * 2 * PROMPTS_PER_STATUS, DIM)).astype(np.float32)
+    text_vectors /= np.linalg.norm(text_vectors, axis=-1, keepdims=True)
+
+    for num_streams in stream_counts:
+        streams = make_streams(num_streams, num_windows, rng)
+        total_windows = num_streams * num_windows
+        for max_batch in batch_sizes:
+            alarmer = StreamAlarmer(text_vectors, engine, max_batch=max_batch, max_latency=float('inf'))
+            start = time.perf_counter()
+            transitions = list(alarmer.run(interleaved_feed(streams)))
+            elapsed = time.perf_counter() - start
+
+            # 배치 모드와 비교
+            runs = transitions_to_runs(transitions, engine.events)
+            identical = True
+            for stream_id, vectors in streams.items():
+                window_alarms = engine.compute(numpy_similarity(vectors, text_vectors))
+                batch_runs = window_alarm_runs(window_alarms, num_windows * FRAME_INTERVAL, FRAME_INTERVAL)
+                for event, (starts, ends) in zip(engine.events, batch_runs):
+                    identical &= list(zip(starts.tolist(), ends.tolist())) == runs.get((stream_id, event), [])
+
+            # 배치가 가득 찰 때까지 기다리는 최대 지연 (윈도우가 한 라운드에 스트림당 1개씩 도착한다고 가정)
+            rounds_per_batch = max(1, max_batch // num_streams)
+            print(f"streams={num_streams:>4} max_batch={max_batch:>4} "
+                  f"windows/s={total_windows / elapsed:12.0f} per_batch={elapsed / max(1, -(-total_windows // max_batch)) * 1000:7.3f}ms "
+                  f"wait_rounds={rounds_per_batch:>3} identical={identical}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,57 @@
+"""
+타일 유사도 계산 벤치마크
+
+(windows, tiles, 1, dim) 벡터에 대해 타일마다 numpy_similarity를 호출하는 방식과
+pia_bench.event_alarm.tiled_similarity(모든 타일을 한 번에 계산 후 축약)를 비교합니다.
+타일 수에 따른 비용이 타일 수에 비례하는지 확인합니다.
+
+실행:
+    python -m benchmarks.bench_tiling
+"""
+import time
+import numpy as np
+from pia_bench.event_alarm import numpy_similarity, tiled_similarity, TILE_MAX
+
+NUM_WINDOWS = 2000
+NUM_PROMPTS = 40
+DIM = 512
+
+
+def per_tile(video_vector: np.ndarray, text_vectors: np.ndarray) -> np.ndarray:
+    """비교용: 타일마다 따로 유사도 계산 후 최댓값"""
+    scores = [numpy_similarity(video_vector[:, tile], text_vectors) for tile in range(video_vector.shape[1])]
+    return np.max(scores, axis=0)
+
+
+def per_window(video_vector: np.ndarray, text_vectors: np.ndarray) -> np.ndarray:
+    """비교용: 윈도우마다 타일 유사도 계산 (호출 수 = 윈도우 수)"""
+    return np.stack([numpy_similarity(window, text_vectors).max(axis=0) for window in video_vector])
+
+
+def run_benchmark(tile_counts=(1, 4, 9, 16), repeat: int = 3):
+    rng = np.random.default_rng(0)
+    text_vectors = rng.standard_normal((NUM_PROMPTS, DIM)).astype(np.float32)
+    text_vectors /= np.linalg.norm(text_vectors, axis=-1, keepdims=True)
+    base = None
+    for num_tiles in tile_counts:
+        video_vector = rng.standard_normal((NUM_WINDOWS, num_tiles, 1, DIM)).astype(np.float32)
+        timings = {}
+        for name, fn in [('per_window', lambda: per_window(video_vector, text_vectors)),
+                         ('per_tile', lambda: per_tile(video_vector, text_vectors)),
+                         ('batched', lambda: tiled_similarity(video_vector, text_vectors, TILE_MAX))]:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = fn()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = (best, result)
+        batched_time, batched = timings['batched']
+        base = base or batched_time
+        same = all(np.allclose(result, batched, atol=1e-5) for _, result in timings.values())
+        print(f"tiles={num_tiles:<3} per_window={timings['per_window'][0] * 1e3:8.1f}ms "
+              f"per_tile={timings['per_tile'][0] * 1e3:8.1f}ms batched={batched_time * 1e3:8.1f}ms "
+              f"(cost x{batched_time / base:4.1f} vs 1 tile, identical={same})")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,64 @@
+"""
+벡터 샤드 목록/로드 벤치마크
+
+비디오별 .npy 파일을 탐색하고 np.load(mmap)로 여는 방식과
+pia_bench.vector_shard.VectorShard(인덱스 한 번 읽기 + 데이터 파일 mmap 슬라이스)를 비교합니다.
+테스트 벡터는 임시 폴더에 생성합니다.
+
+실행:
+    python -m benchmarks.bench_vector_shard
+"""
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from pia_bench.vector_loader import list_vector_files, load_vector
+from pia_bench.vector_shard import VectorShard
+
+NUM_CATEGORIES = 5
+DIM = 512
+
+
+def make_vectors(vector_base_dir: str, num_videos: int):
+    rng = np.random.default_rng(0)
+    for idx in range(num_videos):
+        category_dir = os.path.join(vector_base_dir, f"category{idx % NUM_CATEGORIES}")
+        os.makedirs(category_dir, exist_ok=True)
+        windows = int(rng.integers(20, 400))
+        np.save(os.path.join(category_dir, f"video{idx}.npy"), rng.standard_normal((windows, 1, DIM)).astype(np.float32))
+
+
+def list_and_load(vector_base_dir: str) -> float:
+    """모든 벡터 목록을 만들고 열어 합계를 계산 (열기 비용이 드러나도록 첫 윈도우만 읽음)"""
+    total = 0.0
+    for vector_file in list_vector_files(vector_base_dir):
+        total += float(load_vector(vector_file.path)[0, 0, 0])
+    return total
+
+
+def run_benchmark(video_counts=(1000, 5000), repeat: int = 3):
+    for num_videos in video_counts:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files_dir = os.path.join(tmp_dir, "files")
+            shard_dir = os.path.join(tmp_dir, "shard")
+            make_vectors(files_dir, num_videos)
+            shutil.copytree(files_dir, shard_dir)
+            VectorShard.consolidate(shard_dir)
+
+            timings = {}
+            for name, vector_base_dir in [('files', files_dir), ('shard', shard_dir)]:
+                best = float('inf')
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = list_and_load(vector_base_dir)
+                    best = min(best, time.perf_counter() - start)
+                timings[name] = (best, result)
+            files_time, files_result = timings['files']
+            shard_time, shard_result = timings['shard']
+            print(f"videos={num_videos:<6} files={files_time * 1e3:8.1f}ms shard={shard_time * 1e3:8.1f}ms "
+                  f"({files_time / shard_time:4.1f}x, identical={files_result == shard_result})")
+
+
+if __name__ == "__main__":
+    run_benchmark()
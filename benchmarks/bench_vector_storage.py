@@ -0,0 +1,55 @@
+"""
+벡터 저장 정밀도 벤치마크
+
+float32 / float16 / int8(벡터별 scale) .npy 벡터의 파일 크기, 로드+유사도 계산 시간,
+원본 대비 유사도 차이를 비교합니다. 테스트 벡터는 임시 폴더에 생성합니다.
+(페이지 캐시가 따뜻한 상태의 측정이므로 NAS에서는 크기 비율만큼 읽기 시간이 더 줄어듭니다.)
+
+실행:
+    python -m benchmarks.bench_vector_storage
+"""
+import os
+import tempfile
+import time
+import numpy as np
+from pia_bench.event_alarm import numpy_similarity
+from pia_bench.vector_loader import load_vector
+from pia_bench.vector_quant import quantize, FLOAT16, INT8
+
+NUM_VIDEOS = 200
+NUM_PROMPTS = 40
+DIM = 512
+
+
+def run_benchmark(repeat: int = 3):
+    rng = np.random.default_rng(0)
+    text_vectors = rng.standard_normal((NUM_PROMPTS, DIM)).astype(np.float32)
+    text_vectors /= np.linalg.norm(text_vectors, axis=-1, keepdims=True)
+    vectors = [rng.standard_normal((int(rng.integers(100, 1000)), 1, DIM)).astype(np.float32)
+               for _ in range(NUM_VIDEOS)]
+    reference = [numpy_similarity(vector, text_vectors) for vector in vectors]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base_bytes = None
+        for mode in (None, FLOAT16, INT8):
+            name = mode or "float32"
+            paths = []
+            for idx, vector in enumerate(vectors):
+                path = os.path.join(tmp_dir, f"{name}_{idx}.npy")
+                np.save(path, vector if mode is None else quantize(vector, mode))
+                paths.append(path)
+            total_bytes = sum(os.path.getsize(path) for path in paths)
+            base_bytes = base_bytes or total_bytes
+
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                scores = [numpy_similarity(load_vector(path), text_vectors) for path in paths]
+                best = min(best, time.perf_counter() - start)
+            max_diff = max(float(np.abs(score - ref).max()) for score, ref in zip(scores, reference))
+            print(f"{name:<8} size={total_bytes / 1024 ** 2:7.1f}MB ({total_bytes / base_bytes:4.2f}x) "
+                  f"load+score={best * 1e3:7.1f}ms max_score_diff={max_diff:.5f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,81 @@
+"""
+샘플링 비디오 리더 처리량 벤치마크
+
+모든 프레임을 read()로 디코딩한 뒤 time_sampling 간격만 남기는 기존 방식과
+pia_bench.video_reader.SampledFrameReader의 grab/seek 방식을 비교합니다.
+테스트 비디오는 임시 폴더에 합성하여 사용합니다.
+
+실행:
+    python -m benchmarks.bench_video_reader
+"""
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from pia_bench.video_reader import SampledFrameReader, GRAB, SEEK
+
+TIME_SAMPLING = 15
+FRAME_SIZE = (224, 224)
+
+
+def make_video(path: str, width: int, height: int, num_frames: int, fps: int = 30):
+    """움직이는 패턴의 테스트 비디오 생성"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    for i in range(num_frames):
+        frame = np.roll(background, shift=i * 8, axis=1)
+        cv2.putText(frame, str(i), (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 4, (255, 255, 255), 8)
+        writer.write(frame)
+    writer.release()
+
+
+def full_decode(path: str) -> np.ndarray:
+    """기존 방식: 모든 프레임 read() 후 샘플 프레임만 축소"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    frame_idx = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if frame_idx % TIME_SAMPLING == 0:
+            frame = cv2.resize(frame, FRAME_SIZE, interpolation=cv2.INTER_AREA)
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        frame_idx += 1
+    cap.release()
+    return np.stack(frames)
+
+
+def run_benchmark(resolutions=((1280, 720), (1920, 1080)), num_frames: int = 300, repeat: int = 2):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for width, height in resolutions:
+            path = os.path.join(tmp_dir, f"test_{width}x{height}.mp4")
+            make_video(path, width, height, num_frames)
+
+            def sampled(mode):
+                return SampledFrameReader(path, TIME_SAMPLING, FRAME_SIZE, mode=mode).read_all()[1]
+
+            timings = {}
+            for name, fn in [('full', lambda: full_decode(path)),
+                             ('grab', lambda: sampled(GRAB)),
+                             ('seek', lambda: sampled(SEEK))]:
+                best = float('inf')
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = fn()
+                    best = min(best, time.perf_counter() - start)
+                timings[name] = (best, result)
+
+            full_time, full_frames = timings['full']
+            line = f"{width}x{height} frames={num_frames} full={num_frames / full_time:7.1f}fps"
+            for name in ('grab', 'seek'):
+                elapsed, frames = timings[name]
+                same = frames.shape == full_frames.shape and np.array_equal(frames, full_frames)
+                line += f" {name}={num_frames / elapsed:7.1f}fps ({full_time / elapsed:4.2f}x, identical={same})"
+            print(line)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,6 +1,12 @@
 BASE_BENCH_PATH = "/home/piawsa6000/nas192/videos/huggingface_benchmarks_dataset/Leaderboard_bench"
 
 EXCLUDE_DIRS = {"@eaDir", 'temp'}
+# 비디오 단위 병렬 처리(평가 등)에 사용할 프로세스 수
+NUM_WORKERS = 8
+# 프로세스에 보관할 DevMACSCore 모델 크기 합계 상한 (bytes)
+MODEL_MEMORY_BUDGET = 8 * 1024 ** 3
+# 새로 추출한 비디오 벡터 저장 정밀도 (None: 모델 출력 그대로, "float16", "int8")
+VECTOR_STORAGE = None
 ALL_METRICS = ['accuracy', 'precision', 'recall', 'specificity', 'f1', 'balanced_accuracy', 'g_mean', 'mcc', 'npv', 'far']
 DATA_OPTIONS = ["video_duration", "duration_seconds", "total_frames", "file_size_mb", "aspect_ratio", "fps", "file_format"]
 TASK_MAPPIG = {"Video Retrieval" : "🔎 Video Retrieval🎥", 
@@ -0,0 +1,84 @@
+import numpy as np
+from typing import Dict, List, Any, Tuple, Union
+from utils.parser import CompiledPrompts, compile_prompt_config
+
+
+class AlarmEngine:
+    """
+    (windows × prompts) 유사도 행렬로부터 모든 윈도우/이벤트의 알람을 한 번에 계산하는 클래스입니다.
+
+    이벤트별 프롬프트 인덱스 배열, abnormal 마스크, top_k, threshold를 미리 계산해두고
+    이벤트당 top-k 선택 한 번으로 (windows × events) 알람 배열을 만듭니다.
+
+    Attributes:
+        events (List[str]): 이벤트 이름 목록 (PROMPT_CFG 순서)
+        indices (List[np.ndarray]): 이벤트별 유사도 행렬 열 인덱스
+        abnormal_masks (List[np.ndarray]): 이벤트별 프롬프트의 abnormal 여부
+        top_k (np.ndarray): 이벤트별 top_candidates
+        thresholds (np.ndarray): 이벤트별 alert_threshold
+
+    Example:
+        >>> engine = AlarmEngine.from_config(load_config("topk.json"))
+        >>> alarms = engine.compute(sim_matrix)  # (windows, events)
+    """
+
+    def __init__(self, events: List[str], indices: List[np.ndarray], abnormal_masks: List[np.ndarray],
+                 top_k: List[int], thresholds: List[int]):
+        self.events = list(events)
+        self.indices = [np.asarray(idx, dtype=np.intp) for idx in indices]
+        self.abnormal_masks = [np.asarray(mask, dtype=bool) for mask in abnormal_masks]
+        self.top_k = np.asarray(top_k, dtype=np.intp)
+        self.thresholds = np.asarray(thresholds)
+
+    @classmethod
+    def from_compiled(cls, compiled: CompiledPrompts) -> "AlarmEngine":
+        """PromptManager.compile() 결과로부터 엔진을 생성합니다."""
+        return cls(compiled.events, compiled.indices, compiled.abnormal_masks, compiled.top_k, compiled.thresholds)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AlarmEngine":
+        """
+        CFG의 PROMPT_CFG로부터 엔진을 생성합니다.
+
+        Note:
+            이벤트별 인덱스는 PromptManager.sentences(유사도 행렬 열) 기준 전역 오프셋입니다.
+        """
+        return cls.from_compiled(compile_prompt_config(config))
+
+    @staticmethod
+    def rank(event_scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        행마다 점수가 큰 k개의 (이벤트 내부) 인덱스를 점수 내림차순으로 반환
+
+        Note:
+            동점은 앞선 프롬프트가 먼저 선택됩니다 (torch.topk는 동점 순서가 장치마다 다름).
+            이벤트당 프롬프트 수는 수십 개 이하이므로 안정 정렬 비용은 무시할 수준입니다.
+        """
+        k = max(min(k, event_scores.shape[1]), 0)
+        return np.argsort(-event_scores, axis=1, kind='stable')[:, :k]
+
+    def compute(self, sim_matrix: np.ndarray, return_top_k: bool = False
+                ) -> Union[np.ndarray, Tuple[np.ndarray, List[np.ndarray]]]:
+        """
+        유사도 행렬로 알람을 계산합니다.
+
+        Args:
+            sim_matrix (np.ndarray): (windows, prompts) 유사도 행렬
+            return_top_k (bool): True면 이벤트별 top-k 프롬프트 인덱스도 함께 반환
+
+        Returns:
+            np.ndarray: (windows, events) 0/1 알람 배열 (uint8)
+            return_top_k가 True면 (알람 배열, 이벤트별 (windows, k) 이벤트 내부 프롬프트 인덱스 리스트)
+        """
+        sim_matrix = np.asarray(sim_matrix)
+        alarms = np.zeros((sim_matrix.shape[0], len(self.events)), dtype=np.uint8)
+        top_k_indices = []
+        for event_idx, (indices, mask) in enumerate(zip(self.indices, self.abnormal_masks)):
+            top_indices = self.rank(sim_matrix[:, indices], self.top_k[event_idx])
+            abnormal_count = mask[top_indices].sum(axis=1)
+            alarms[:, event_idx] = abnormal_count >= self.thresholds[event_idx]
+            if return_top_k:
+                top_k_indices.append(top_indices)
+        if return_top_k:
+            return alarms, top_k_indices
+        return alarms
@@ -0,0 +1,144 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+from pia_bench.intervals import window_alarm_runs, runs_to_mask
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+ALARM_INTERVAL_FILE = "alarm_intervals.npz"
+
+
+class AlarmIntervalStore:
+    """
+    벤치마크 실행 한 번의 알람 결과를 이벤트별 구간(RLE)으로 보관하는 클래스입니다.
+
+    비디오당 프레임별 CSV 대신, 알람이 켜진 [start, end) 프레임 구간만
+    컬럼형 배열로 모아 알람 폴더 아래 npz 파일 하나로 저장합니다.
+
+    저장 구조 ({alarm_dir}/alarm_intervals.npz):
+        - events: (E,) 이벤트 이름
+        - categories, videos, total_frames: (V,) 비디오별 카테고리, 이름, 전체 프레임 수
+        - run_video, run_event, run_start, run_end: (R,) 구간별 비디오/이벤트 인덱스와 프레임 범위
+
+    Example:
+        >>> store = AlarmIntervalStore(["falldown", "fire"])
+        >>> store.add("fire", "video1", 9000, window_alarms, frame_interval=15)
+        >>> store.save("alarm")
+        >>> store = AlarmIntervalStore.load("alarm")
+        >>> df = store.to_frame_dataframe("fire", "video1")
+    """
+
+    def __init__(self, events: List[str]):
+        self.events = list(events)
+        self._videos: Dict[Tuple[str, str], int] = {}
+        self._runs: Dict[Tuple[str, str], List[Tuple[np.ndarray, np.ndarray]]] = {}
+
+    @staticmethod
+    def exists(alarm_dir: str) -> bool:
+        return os.path.isfile(os.path.join(alarm_dir, ALARM_INTERVAL_FILE))
+
+    def add(self, category: str, video_name: str, total_frames: int, window_alarms: np.ndarray, frame_interval: int):
+        """윈도우 단위 알람을 구간으로 변환하여 추가"""
+        self.add_runs(category, video_name, total_frames,
+                      window_alarm_runs(window_alarms, total_frames, frame_interval))
+
+    def add_runs(self, category: str, video_name: str, total_frames: int, runs: List[Tuple[np.ndarray, np.ndarray]]):
+        """이벤트별 (시작, 끝) 프레임 구간을 그대로 추가"""
+        key = (category, video_name)
+        self._videos[key] = int(total_frames)
+        self._runs[key] = [(np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64))
+                           for starts, ends in runs]
+
+    def categories(self) -> List[str]:
+        """저장된 카테고리 목록 (추가된 순서)"""
+        return list(dict.fromkeys(category for category, _ in self._videos))
+
+    def videos(self, category: str) -> List[str]:
+        """카테고리에 속한 비디오 이름 목록 (추가된 순서)"""
+        return [video for cat, video in self._videos if cat == category]
+
+    def total_frames(self, category: str, video_name: str) -> int:
+        return self._videos[(category, video_name)]
+
+    def get_runs(self, category: str, video_name: str) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """이벤트별 (시작 프레임, 끝 프레임) 구간 반환"""
+        return dict(zip(self.events, self._runs[(category, video_name)]))
+
+    def to_frame_array(self, category: str, video_name: str) -> np.ndarray:
+        """(total_frames, events) 프레임별 0/1 배열로 복원"""
+        total_frames = self.total_frames(category, video_name)
+        columns = [runs_to_mask(starts, ends, total_frames) for starts, ends in self._runs[(category, video_name)]]
+        if not columns:
+            return np.zeros((total_frames, 0), dtype=np.uint8)
+        return np.stack(columns, axis=1)
+
+    def to_frame_dataframe(self, category: str, video_name: str) -> pd.DataFrame:
+        """기존 알람 CSV와 같은 형태(frame + 이벤트 컬럼)의 데이터프레임으로 복원"""
+        df = pd.DataFrame(self.to_frame_array(category, video_name), columns=self.events)
+        df.insert(0, 'frame', np.arange(len(df)))
+        return df
+
+    def export_csv(self, alarm_dir: str):
+        """비디오별 프레임 CSV로 내보내기 ({alarm_dir}/{category}/{video}.csv)"""
+        for category, video_name in self._videos:
+            save_category_dir = os.path.join(alarm_dir, category)
+            os.makedirs(save_category_dir, exist_ok=True)
+            self.to_frame_dataframe(category, video_name).to_csv(
+                os.path.join(save_category_dir, f"{video_name}.csv"), index=False)
+
+    def save(self, alarm_dir: str) -> str:
+        """구간 파일 저장 후 경로 반환"""
+        os.makedirs(alarm_dir, exist_ok=True)
+        keys = list(self._videos)
+        run_video, run_event, run_start, run_end = [], [], [], []
+        for video_idx, key in enumerate(keys):
+            for event_idx, (starts, ends) in enumerate(self._runs[key]):
+                run_video.append(np.full(len(starts), video_idx, dtype=np.int32))
+                run_event.append(np.full(len(starts), event_idx, dtype=np.int16))
+                run_start.append(starts)
+                run_end.append(ends)
+
+        def _concat(arrays, dtype):
+            return np.concatenate(arrays).astype(dtype) if arrays else np.zeros(0, dtype=dtype)
+
+        save_path = os.path.join(alarm_dir, ALARM_INTERVAL_FILE)
+        np.savez_compressed(
+            save_path,
+            events=np.array(self.events),
+            categories=np.array([category for category, _ in keys]),
+            videos=np.array([video for _, video in keys]),
+            total_frames=np.array([self._videos[key] for key in keys], dtype=np.int64),
+            run_video=_concat(run_video, np.int32),
+            run_event=_concat(run_event, np.int16),
+            run_start=_concat(run_start, np.int64),
+            run_end=_concat(run_end, np.int64),
+        )
+        logger.info(f"Saved alarm intervals for {len(keys)} videos to {save_path}")
+        return save_path
+
+    @classmethod
+    def load(cls, alarm_dir: str) -> "AlarmIntervalStore":
+        """구간 파일을 한 번 읽어 메모리에 복원"""
+        with np.load(os.path.join(alarm_dir, ALARM_INTERVAL_FILE)) as data:
+            store = cls(data['events'].tolist())
+            categories, videos = data['categories'].tolist(), data['videos'].tolist()
+            total_frames = data['total_frames']
+            run_video, run_event = data['run_video'], data['run_event']
+            run_start, run_end = data['run_start'], data['run_end']
+
+        # 비디오/이벤트 순으로 정렬된 구간을 한 번에 분할
+        order = np.lexsort((run_start, run_event, run_video))
+        run_video, run_event = run_video[order], run_event[order]
+        run_start, run_end = run_start[order], run_end[order]
+        group = run_video.astype(np.int64) * len(store.events) + run_event
+        bounds = np.searchsorted(group, np.arange(len(videos) * len(store.events) + 1))
+
+        for video_idx, key in enumerate(zip(categories, videos)):
+            runs = []
+            for event_idx in range(len(store.events)):
+                lo = bounds[video_idx * len(store.events) + event_idx]
+                hi = bounds[video_idx * len(store.events) + event_idx + 1]
+                runs.append((run_start[lo:hi], run_end[lo:hi]))
+            store.add_runs(key[0], key[1], int(total_frames[video_idx]), runs)
+        return store
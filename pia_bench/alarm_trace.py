@@ -0,0 +1,65 @@
+import os
+import numpy as np
+from typing import Dict, List
+from pia_bench.alarm_engine import AlarmEngine
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+
+class AlarmTrace:
+    """
+    알람 결정 과정(유사도 점수, top-k 타입, 최종 결정)을 기록하는 선택적 트레이스입니다.
+
+    검출기 생성 시 한 번만 설정되며, 비디오별 결과를 메모리에 모아두었다가
+    flush() 호출 시 비디오당 압축 npz 파일 하나로 일괄 저장합니다.
+
+    저장 구조:
+        {trace_dir}/{category}/{video_name}.npz
+            - frames: (windows,) 윈도우 시작 프레임
+            - scores: (windows, prompts) 유사도 행렬
+            - alarms: (windows, events) 최종 알람
+            - events, sentences: 이벤트/프롬프트 이름
+            - {event}_top_k_prompts: (windows, k) 선택된 프롬프트의 유사도 행렬 열 인덱스
+            - {event}_top_k_scores: (windows, k) 선택된 프롬프트 점수
+            - {event}_top_k_abnormal: (windows, k) 선택된 프롬프트의 abnormal 여부
+
+    Example:
+        >>> trace = AlarmTrace("trace", engine, sentences)
+        >>> trace.record("fire", "video1", frames, sim_matrix, alarms, top_k_indices)
+        >>> trace.flush()
+    """
+
+    def __init__(self, trace_dir: str, engine: AlarmEngine, sentences: List[str]):
+        self.trace_dir = trace_dir
+        self.engine = engine
+        self.sentences = np.array(sentences)
+        self._buffer: Dict[str, Dict[str, np.ndarray]] = {}
+        os.makedirs(self.trace_dir, exist_ok=True)
+
+    def record(self, category: str, video_name: str, frames: np.ndarray, sim_matrix: np.ndarray,
+               alarms: np.ndarray, top_k_indices: List[np.ndarray]):
+        """비디오 한 개의 알람 결정 과정을 버퍼에 추가"""
+        record = {
+            'frames': np.asarray(frames),
+            'scores': np.asarray(sim_matrix, dtype=np.float32),
+            'alarms': alarms,
+            'events': np.array(self.engine.events),
+            'sentences': self.sentences,
+        }
+        for event, indices, mask, local in zip(self.engine.events, self.engine.indices,
+                                              self.engine.abnormal_masks, top_k_indices):
+            columns = indices[local]
+            record[f"{event}_top_k_prompts"] = columns
+            record[f"{event}_top_k_scores"] = np.take_along_axis(record['scores'], columns, axis=1)
+            record[f"{event}_top_k_abnormal"] = mask[local]
+        self._buffer[os.path.join(category, video_name)] = record
+
+    def flush(self):
+        """버퍼에 모인 트레이스를 비디오별 압축 파일로 저장하고 버퍼를 비움"""
+        for key, record in self._buffer.items():
+            save_path = os.path.join(self.trace_dir, f"{key}.npz")
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            np.savez_compressed(save_path, **record)
+        if self._buffer:
+            logger.info(f"Saved {len(self._buffer)} alarm traces to {self.trace_dir}")
+        self._buffer.clear()
@@ -1,11 +1,19 @@
 import os
 import shutil
-from devmacs_core.devmacs_core import DevMACSCore
-from typing import Dict, List, Tuple
+from utils.model_registry import get_model
+from typing import Callable, Dict, List, Optional, Tuple
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from utils.except_dir import cust_listdir
 from utils.parser import load_config
+from pia_bench.label_builder import LabelConverter, build_frame_labels
+from pia_bench.label_store import LabelStore
+from pia_bench.checker.bench_checker import BenchChecker
+from pia_bench.vector_shard import VectorShard, split_shard_path
+from pia_bench.vector_quant import quantize, quantize_vector_file, quantize_vectors
+from pia_bench.ingest import IngestPipeline, window_vectors
+from enviroments.config import NUM_WORKERS, VECTOR_STORAGE
 from utils.logger import custom_logger
 from dotenv import load_dotenv
 logger = custom_logger(__name__)
@@ -15,6 +23,9 @@ CFG = "CFG"
 VECTOR = "vector"
 TEXT = "text"
 VIDEO = "video"
+SCORE = "score"
+STAGING = "staging"
+QUARANTINE = "quarantine"
 EXECPT = ["@eaDir", "README.md"]
 ALRAM = "alarm"
 METRIC = "metric"
@@ -55,6 +66,9 @@ class PiaBenchMarkSet:
         self.vector_path = os.path.join(self.model_name_path , VECTOR)
         self.vector_text_path = os.path.join(self.vector_path , TEXT)
         self.vector_video_path = os.path.join(self.vector_path , VIDEO)
+        self.vector_score_path = os.path.join(self.vector_path , SCORE)
+        self.vector_staging_path = os.path.join(self.vector_path , STAGING)
+        self.vector_quarantine_path = os.path.join(self.vector_path , QUARANTINE)
 
         self.categories = []
 
@@ -72,17 +86,7 @@ class PiaBenchMarkSet:
         Note:
             반환되는 데이터프레임은 각 프레임별로 카테고리의 존재 여부를 0과 1로 표시합니다.
         """
-        colmuns = ['frame'] + sorted(self.categories)
-        df = pd.DataFrame(0, index=range(total_frames), columns=colmuns)
-        df['frame'] = range(total_frames)
-        
-        for clip_info in label_data['clips'].values():
-            category = clip_info['category']
-            if category in self.categories:  # 해당 카테고리가 목록에 있는 경우만 처리
-                start_frame, end_frame = clip_info['timestamp']
-                df.loc[start_frame:end_frame, category] = 1
-                
-        return df
+        return build_frame_labels(label_data, total_frames, self.categories)
 
     def preprocess_label_to_csv(self):
         """
@@ -93,11 +97,11 @@ class PiaBenchMarkSet:
             
         Note:
             - 각 카테고리 폴더 내의 JSON 파일을 처리합니다.
-            - 이미 CSV로 변환된 파일은 건너뜁니다.
+            - 새로 생겼거나 내용이 바뀐 JSON만 프로세스 풀로 변환합니다 (dataset/label_manifest.json).
+            - 레이블 인덱스(dataset/label_index.npz)도 함께 갱신합니다.
         """
         json_files = []
-        csv_files = []
-        
+
         # categories가 비어있는 경우에만 채우도록 수정
         if not self.categories:
             for cate in cust_listdir(self.dataset_path):
@@ -108,29 +112,14 @@ class PiaBenchMarkSet:
             category_path = os.path.join(self.dataset_path, category)
             category_jsons = [os.path.join(category, f) for f in cust_listdir(category_path) if f.endswith('.json')]
             json_files.extend(category_jsons)
-            category_csvs = [os.path.join(category, f) for f in cust_listdir(category_path) if f.endswith('.csv')]
-            csv_files.extend(category_csvs)
 
         if not json_files:
             logger.error("No JSON files found in any category directory")
             raise ValueError("No JSON files found in any category directory")
-        
-        if len(json_files) == len(csv_files):
-            logger.info("All JSON files have already been processed to CSV. No further processing needed.")
-            return
 
-        for json_file in json_files:
-            json_path = os.path.join(self.dataset_path, json_file)
-            video_name = os.path.splitext(json_file)[0] 
-            
-            label_info = load_config(json_path)
-            video_info = label_info['video_info']
-            total_frames = video_info['total_frame']
-            
-            df = self._create_frame_labels( label_info, total_frames)
-            
-            output_path = os.path.join(self.dataset_path, f"{video_name}.csv")
-            df.to_csv(output_path , index=False)
+        LabelConverter(self.dataset_path, self.categories, num_workers=NUM_WORKERS).convert(json_files)
+        # 알람 생성/평가에서 한 번만 읽는 레이블 인덱스 갱신
+        LabelStore.build(self.dataset_path, json_files)
         logger.info("Complete !")
 
     def preprocess_structure(self):
@@ -179,6 +168,18 @@ class PiaBenchMarkSet:
 
         logger.info("Folder preprocessing completed.")
     
+    def _check_untiled_extraction(self):
+        """
+        save_visual_results는 프레임을 타일로 나누지 않으므로 VIDEO_CFG.tile_size가 설정되어 있으면 추출을 막습니다.
+
+        Raises:
+            ValueError: VIDEO_CFG.tile_size가 설정된 경우 (타일 벡터는 extract_missing_vectors(encoder=...)로 추출)
+        """
+        tile_size = self.cfg_dict.get('VIDEO_CFG', {}).get('tile_size')
+        if tile_size:
+            raise ValueError(f"VIDEO_CFG.tile_size={tile_size} cannot be applied by save_visual_results; "
+                             f"pass a frame encoder to extract_missing_vectors to extract tiled vectors")
+
     def extract_visual_vector(self):
         """
         데이터셋에서 시각적 특징 벡터를 추출합니다.
@@ -189,10 +190,14 @@ class PiaBenchMarkSet:
             
         Requires:
             DevMACSCore가 초기화되어 있어야 합니다.
+
+        Raises:
+            ValueError: VIDEO_CFG.tile_size가 설정된 경우
         """
         logger.info(f"Starting visual vector extraction using model: {self.model_name}")
+        self._check_untiled_extraction()
         try:
-            self.devmacs_core = DevMACSCore.from_huggingface(token=self.token, repo_id=f"PIA-SPACE-LAB/{self.model_name}")
+            self.devmacs_core = get_model(f"PIA-SPACE-LAB/{self.model_name}", token=self.token)
             self.devmacs_core.save_visual_results(
                 vid_dir = self.dataset_path,
                 result_dir = self.vector_video_path
@@ -201,6 +206,158 @@ class PiaBenchMarkSet:
             logger.error(f"Error during vector extraction: {str(e)}")
             raise
 
+    def extract_missing_vectors(self, encoder: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                                num_decoders: Optional[int] = None):
+        """
+        벡터가 없는 비디오만 추출하고, 데이터셋에 없는 벡터는 격리합니다.
+
+        Args:
+            encoder: (batch, H, W, 3) uint8 RGB 프레임 -> (batch, dim) 프레임 인코더.
+                주어지면 save_visual_results 대신 IngestPipeline으로 추출합니다.
+            num_decoders: IngestPipeline 디코더 프로세스 수 (encoder를 준 경우만 사용)
+
+        Raises:
+            ValueError: encoder 없이 VIDEO_CFG.tile_size가 설정된 경우
+
+        Note:
+            - 비디오마다 vector/staging/{category}__{video}/ 아래에 입력 심볼릭 링크와 출력 폴더를 만들어
+              save_visual_results를 실행한 뒤, 결과 .npy를 vector/video/{category}/로 원자적으로 옮깁니다.
+            - 완성된 벡터만 vector/video에 나타나므로, 중단 후 다시 실행하면 남은 비디오부터 이어서 추출합니다.
+            - 데이터셋에 없는 벡터는 삭제하지 않고 vector/quarantine/{category}/로 옮깁니다.
+            - 벡터 샤드가 있으면 샤드 항목도 비교하고, 새로 추출한 벡터는 샤드에 추가합니다.
+            - config.VECTOR_STORAGE가 설정되어 있으면 옮기기 전에 해당 정밀도(float16/int8)로 변환합니다.
+            - encoder로 추출한 벡터는 window_vectors로 묶은 (windows, [tiles,] window_size, dim) 형태입니다.
+              save_visual_results 벡터와 섞이지 않도록 한 모델의 벡터는 한 가지 방식으로만 추출하세요.
+        """
+        if encoder is None:
+            self._check_untiled_extraction()
+        benchmark_path = Path(self.benchmark_path)
+        missing, extra = BenchChecker(str(benchmark_path.parent)).diff_vector_files(benchmark_path.name, self.model_name)
+
+        shard = VectorShard.load(self.vector_video_path) if VectorShard.exists(self.vector_video_path) else None
+        shard_extra = []
+        for vector_file in extra:
+            quarantine_dir = os.path.join(self.vector_quarantine_path, vector_file.parent.name)
+            os.makedirs(quarantine_dir, exist_ok=True)
+            if split_shard_path(str(vector_file)) is not None:
+                # 샤드 항목은 .npy로 꺼내 둔 뒤 인덱스에서 삭제
+                key = (vector_file.parent.name, vector_file.stem)
+                np.save(os.path.join(quarantine_dir, vector_file.name), shard.get(*key))
+                shard_extra.append(key)
+            else:
+                shutil.move(str(vector_file), os.path.join(quarantine_dir, vector_file.name))
+            logger.warning(f"Quarantined vector without dataset video: {vector_file.parent.name}/{vector_file.name}")
+        if shard_extra:
+            shard.remove(shard_extra)
+
+        # 이전 실행에서 중단된 작업 폴더 정리
+        shutil.rmtree(self.vector_staging_path, ignore_errors=True)
+        if not missing:
+            logger.info("All dataset videos already have vectors.")
+            # 샤드 옆에 남은 .npy(추가 전에 중단된 경우)는 샤드로 옮겨 인덱스만으로 검사되도록 함
+            if VectorShard.exists(self.vector_video_path):
+                self.consolidate_vectors()
+            return
+
+        if encoder is not None:
+            self._extract_with_pipeline(missing, encoder, num_decoders)
+            if VectorShard.exists(self.vector_video_path):
+                self.consolidate_vectors()
+            return
+
+        logger.info(f"Extracting vectors for {len(missing)} missing videos using model: {self.model_name}")
+        self.devmacs_core = get_model(f"PIA-SPACE-LAB/{self.model_name}", token=self.token)
+        for video_file in missing:
+            category = video_file.parent.name
+            staging_dir = os.path.join(self.vector_staging_path, f"{category}__{video_file.stem}")
+            input_dir = os.path.join(staging_dir, "input", category)
+            output_dir = os.path.join(staging_dir, "output")
+            os.makedirs(input_dir)
+            os.makedirs(output_dir)
+            os.symlink(os.path.abspath(video_file), os.path.join(input_dir, video_file.name))
+            try:
+                self.devmacs_core.save_visual_results(
+                    vid_dir = os.path.join(staging_dir, "input"),
+                    result_dir = output_dir
+                )
+                results = list(Path(output_dir).rglob(f"{video_file.stem}.npy"))
+                if not results:
+                    raise FileNotFoundError(f"No vector produced for {category}/{video_file.name}")
+                if VECTOR_STORAGE:
+                    quantize_vector_file(str(results[0]), VECTOR_STORAGE)
+                target_dir = os.path.join(self.vector_video_path, category)
+                os.makedirs(target_dir, exist_ok=True)
+                os.replace(results[0], os.path.join(target_dir, f"{video_file.stem}.npy"))
+            except Exception as e:
+                logger.error(f"Error during vector extraction for {category}/{video_file.name}: {str(e)}")
+                raise
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        shutil.rmtree(self.vector_staging_path, ignore_errors=True)
+        logger.info(f"Extracted {len(missing)} vectors.")
+        if VectorShard.exists(self.vector_video_path):
+            self.consolidate_vectors()
+
+    def _extract_with_pipeline(self, missing: List[Path], encoder: Callable[[np.ndarray], np.ndarray],
+                               num_decoders: Optional[int] = None):
+        """
+        IngestPipeline으로 missing 비디오의 벡터를 추출하여 vector/video/{category}/에 저장
+
+        Note:
+            비디오가 끝나는 순서대로 staging에 쓴 뒤 원자적으로 옮기므로 중단 후 다시 실행하면 이어서 추출합니다.
+        """
+        video_cfg = self.cfg_dict.get('VIDEO_CFG', {})
+        window_size = video_cfg.get('window_size', 1)
+        logger.info(f"Extracting vectors for {len(missing)} missing videos with IngestPipeline")
+        os.makedirs(self.vector_staging_path, exist_ok=True)
+        pipeline = IngestPipeline([str(video_file) for video_file in missing], video_cfg, encoder,
+                                  num_decoders=num_decoders)
+        for video_path, _, embeddings in pipeline.run():
+            video_file = Path(video_path)
+            category = video_file.parent.name
+            if len(embeddings) == 0:
+                raise ValueError(f"No frames decoded from {category}/{video_file.name}")
+            vector = window_vectors(embeddings, window_size)
+            if VECTOR_STORAGE:
+                vector = quantize(vector, VECTOR_STORAGE)
+            staging_file = os.path.join(self.vector_staging_path, f"{category}__{video_file.stem}.npy")
+            np.save(staging_file, vector)
+            target_dir = os.path.join(self.vector_video_path, category)
+            os.makedirs(target_dir, exist_ok=True)
+            os.replace(staging_file, os.path.join(target_dir, f"{video_file.stem}.npy"))
+        shutil.rmtree(self.vector_staging_path, ignore_errors=True)
+        logger.info(f"Extracted {len(missing)} vectors.")
+
+    def consolidate_vectors(self) -> VectorShard:
+        """
+        vector/video/{category}/*.npy 벡터를 vector/video/의 벡터 샤드(vectors.N.bin + vector_index.npz)로 합칩니다.
+
+        Note:
+            이미 샤드가 있으면 새 .npy만 추가하며, 추가한 .npy 파일은 인덱스 저장 후 삭제합니다.
+        """
+        return VectorShard.consolidate(self.vector_video_path)
+
+    def quantize_vectors(self, mode: str = VECTOR_STORAGE) -> int:
+        """
+        저장된 비디오 벡터(.npy와 샤드)를 float16 또는 int8로 변환합니다.
+
+        Note:
+            변환 전 quantization_report로 원본 대비 알람 변화를 확인하세요.
+
+        Returns:
+            int: 줄어든 바이트 수
+        """
+        if not mode:
+            raise ValueError("Vector storage mode is not set (expected 'float16' or 'int8')")
+        return quantize_vectors(self.vector_video_path, mode)
+
+    def compact_vectors(self) -> int:
+        """벡터 샤드에서 교체/삭제된 항목의 공간을 회수 (회수한 바이트 수 반환)"""
+        if not VectorShard.exists(self.vector_video_path):
+            logger.info("No vector shard to compact.")
+            return 0
+        return VectorShard.load(self.vector_video_path).compact()
+
 if __name__ == "__main__":
 
     load_dotenv()
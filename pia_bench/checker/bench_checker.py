@@ -1,9 +1,10 @@
 import os
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from pathlib import Path
 import json
 import numpy as np
+from pia_bench.vector_shard import VectorShard, shard_vector_path
 
 # logging.basicConfig(level=logging.INFO)
 from utils.logger import custom_logger
@@ -77,12 +78,17 @@ class BenchChecker:
             logger.error(f"Model CFG directory not found: {cfg_prompt}")
             
         return benchmark_cfg_exists, model_cfg_exists
-    def check_vector_files(self, benchmark_name: str, model_name: str, video_list: List[str]) -> bool:
-        """Check if video vectors match with dataset."""
+    def check_vector_files(self, benchmark_name: str, model_name: str, videos: Set[Tuple[str, str]]) -> bool:
+        """Check if video vectors match with dataset.
+
+        Args:
+            videos: Dataset videos as ``(category, video)`` keys (see ``_dataset_videos``), so
+                videos with the same file name in different categories are counted separately.
+        """
         vector_path = self.base_path / benchmark_name / "models" / model_name / "vector" / "video"
         
         # 비디오가 없는 경우는 무조건 False
-        if not video_list:
+        if not videos:
             logger.error("No videos found in dataset - cannot proceed")
             return False
         
@@ -90,24 +96,71 @@ class BenchChecker:
         if not vector_path.exists():
             logger.error("Vector directory doesn't exist")
             return False
-                
-        # 벡터 파일 리스트 가져오기
-        # vector_files = [f.stem for f in vector_path.glob("*.npy")]
-        vector_files = [f.stem for f in vector_path.rglob("*.npy")]
-        
-        missing_vectors = set(video_list) - set(vector_files)
-        extra_vectors = set(vector_files) - set(video_list)
+
+        # 벡터 샤드가 있으면 인덱스만 읽음
+        videos = set(videos)
+        vectors = set(self._vector_files(vector_path, include_loose=not VectorShard.exists(str(vector_path))))
+
+        missing_vectors = videos - vectors
+        extra_vectors = vectors - videos
         
         if missing_vectors:
-            logger.error(f"Missing vectors for videos: {missing_vectors}")
+            logger.error(f"Missing vectors for videos: {sorted(missing_vectors)}")
             return False
         if extra_vectors:
-            logger.error(f"Extra vectors found: {extra_vectors}")
+            logger.error(f"Extra vectors found: {sorted(extra_vectors)}")
             return False
                 
-        logger.info(f"Vector status: videos={len(video_list)}, vectors={len(vector_files)}")
-        return len(video_list) == len(vector_files)
+        logger.info(f"Vector status: videos={len(videos)}, vectors={len(vectors)}")
+        return True
+
+    def _dataset_videos(self, benchmark_name: str) -> Dict[Tuple[str, str], Path]:
+        """Map ``(category, video)`` to each dataset video file."""
+        dataset_path = self.base_path / benchmark_name / "dataset"
+        videos = {}
+        if dataset_path.exists():
+            for category in dataset_path.glob("*"):
+                if category.is_dir():
+                    for video_file in category.glob("*.mp4"):
+                        videos[(category.name, video_file.stem)] = video_file
+        return videos
+
+    def _vector_files(self, vector_path: Path, include_loose: bool = True) -> Dict[Tuple[str, str], Path]:
+        """Map ``(category, video)`` to each extracted vector.
+
+        Shard entries use their virtual ``@shard/{category}/{video}.npy`` paths; loose
+        ``{category}/{video}.npy`` files take precedence when ``include_loose`` is set.
+        """
+        vectors = {}
+        if VectorShard.exists(str(vector_path)):
+            for category, video in VectorShard.load(str(vector_path)).keys():
+                vectors[(category, video)] = Path(shard_vector_path(str(vector_path), category, video))
+        if include_loose and vector_path.exists():
+            for category in vector_path.glob("*"):
+                if category.is_dir():
+                    for vector_file in category.glob("*.npy"):
+                        vectors[(category.name, vector_file.stem)] = vector_file
+        return vectors
     
+    def diff_vector_files(self, benchmark_name: str, model_name: str) -> Tuple[List[Path], List[Path]]:
+        """Compare dataset videos with extracted vectors per category.
+
+        Vectors consolidated into a vector shard are included with their virtual
+        ``@shard/{category}/{video}.npy`` paths.
+
+        Returns:
+            Tuple[List[Path], List[Path]]: (dataset videos without a vector, vectors without a dataset video)
+        """
+        vector_path = self.base_path / benchmark_name / "models" / model_name / "vector" / "video"
+        videos = self._dataset_videos(benchmark_name)
+        vectors = self._vector_files(vector_path)
+
+        missing = [videos[key] for key in sorted(set(videos) - set(vectors))]
+        extra = [vectors[key] for key in sorted(set(vectors) - set(videos))]
+        logger.info(f"Vector diff: videos={len(videos)}, vectors={len(vectors)}, "
+                    f"missing={len(missing)}, extra={len(extra)}")
+        return missing, extra
+
     def check_metrics_file(self, benchmark_name: str, model_name: str, cfg_prompt: str) -> bool:
         """Check if overall_metrics.json exists in the model's CFG/metrics directory."""
         metrics_path = self.base_path / benchmark_name / "models" / model_name / "CFG" / cfg_prompt / "metric" / "overall_metrics.json"
@@ -136,8 +189,9 @@ class BenchChecker:
         if not status['benchmark_exists']:
             return status
                 
-        # Get video list
-        video_list = self.get_video_list(benchmark_name)
+        # Get dataset videos as (category, video) keys
+        videos = set(self._dataset_videos(benchmark_name))
+        logger.info(f"Found {len(videos)} videos in {benchmark_name} dataset")
         
         # Check model directory
         status['model_exists'] = self.check_model_exists(benchmark_name, model_name)
@@ -151,7 +205,7 @@ class BenchChecker:
             return status
 
         # Check vectors
-        status['vectors_match'] = self.check_vector_files(benchmark_name, model_name, video_list)
+        status['vectors_match'] = self.check_vector_files(benchmark_name, model_name, videos)
         
         # Check metrics file (only if vectors match)
         if status['vectors_match']:
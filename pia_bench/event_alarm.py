@@ -1,225 +1,376 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import torch
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional
 from devmacs_core.devmacs_core import DevMACSCore
 # from devmacs_core.devmacs_core_copy import DevMACSCore
 from devmacs_core.utils.common.cal import loose_similarity
-from utils.parser import load_config, PromptManager
+from utils.parser import get_prompt_manager
+from utils.model_registry import get_model
+from pia_bench.alarm_engine import AlarmEngine
+from pia_bench.alarm_trace import AlarmTrace
+from pia_bench.intervals import expand_window_alarms, window_alarm_runs
+from pia_bench.alarm_store import AlarmIntervalStore
+from pia_bench.label_store import LabelStore
+from pia_bench.score_cache import SimilarityCache, DEFAULT_MAX_BYTES
+from pia_bench.text_cache import TextVectorCache
+from pia_bench.vector_quant import dequantize
+from pia_bench.vector_loader import VectorFile, VectorLoader, list_vector_files, load_vector, to_tensor, DEFAULT_PREFETCH
 import json
 import pandas as pd
 from tqdm import tqdm
-import logging
-from datetime import datetime
-from utils.except_dir import cust_listdir
 from utils.logger import custom_logger
 logger = custom_logger(__name__)
+
+FRAME_INTERVAL = 15
+NUMPY_DEVICE = "numpy"
+TILE_MAX = "max"
+TILE_MEAN = "mean"
+TILE_CHUNK_ROWS = 2048
+
+
+def tile_reduce_mode(video_cfg: Dict) -> Optional[str]:
+    """
+    VIDEO_CFG의 타일 점수 축약 방식 (tile_size가 없으면 None)
+
+    Raises:
+        ValueError: tile_reduce가 "max" 또는 "mean"이 아닌 경우
+    """
+    if not video_cfg.get('tile_size'):
+        return None
+    mode = video_cfg.get('tile_reduce', TILE_MAX)
+    if mode not in (TILE_MAX, TILE_MEAN):
+        raise ValueError(f"Unknown tile_reduce '{mode}', expected '{TILE_MAX}' or '{TILE_MEAN}'")
+    return mode
+
+
+def flatten_tiles(video_vector: np.ndarray) -> np.ndarray:
+    """(windows, tiles, ..., dim) 벡터를 (windows * tiles, ..., dim)으로 펼침"""
+    return video_vector.reshape((-1,) + video_vector.shape[2:])
+
+
+def reduce_tile_scores(sim_matrix: np.ndarray, num_tiles: int, mode: str) -> np.ndarray:
+    """(windows * tiles, prompts) 타일 유사도를 프롬프트별로 축약해 (windows, prompts)로 변환"""
+    scores = sim_matrix.reshape(-1, num_tiles, sim_matrix.shape[-1])
+    return scores.max(axis=1) if mode == TILE_MAX else scores.mean(axis=1)
+
+
+def numpy_similarity(video_vector: np.ndarray, text_vectors: np.ndarray) -> np.ndarray:
+    """
+    NumPy로 (windows, prompts) 유사도 행렬 계산
+
+    Args:
+        video_vector: (windows, ..., dim) 비디오 벡터
+        text_vectors: (prompts, dim) 정규화된 텍스트 벡터
+    """
+    # loose_similarity와 동일한 순서: 정규화 -> 평균 풀링 -> 정규화 -> 내적
+    # float16/int8로 저장된 벡터는 float32로 복원 (float32는 복사 없음)
+    visual = dequantize(video_vector)
+    visual = visual.reshape(visual.shape[0], -1, visual.shape[-1])
+    visual = visual / np.linalg.norm(visual, axis=-1, keepdims=True)
+    visual = visual.mean(axis=1)
+    visual = visual / np.linalg.norm(visual, axis=-1, keepdims=True)
+    return visual @ text_vectors.T
+
+
+def tiled_similarity(video_vector: np.ndarray, text_vectors: np.ndarray, mode: Optional[str]) -> np.ndarray:
+    """
+    타일 벡터의 (windows, prompts) 유사도 (mode가 None이면 numpy_similarity와 동일)
+
+    모든 윈도우의 타일을 한 번의 행렬곱으로 계산한 뒤 타일 축을 축약합니다.
+
+    Args:
+        video_vector: (windows, tiles, ..., dim) 비디오 벡터
+        text_vectors: (prompts, dim) 정규화된 텍스트 벡터
+        mode: "max" 또는 "mean"
+    """
+    if mode is None:
+        return numpy_similarity(video_vector, text_vectors)
+    num_tiles = video_vector.shape[1]
+    tiles = flatten_tiles(video_vector)
+    # 정규화 임시 배열이 캐시에 머물도록 윈도우 단위로 나눠 계산 (행별 연산이라 결과는 동일)
+    step = max(1, TILE_CHUNK_ROWS // num_tiles) * num_tiles
+    sim_matrix = np.concatenate([numpy_similarity(tiles[start:start + step], text_vectors)
+                                 for start in range(0, max(len(tiles), 1), step)])
+    return reduce_tile_scores(sim_matrix, num_tiles, mode)
+
+
+def expand_predictions(window_alarms: np.ndarray, total_frames: int, events: List[str]) -> pd.DataFrame:
+    """윈도우 알람을 기존 알람 CSV 형태(frame + 이벤트 컬럼)의 프레임 데이터프레임으로 확장"""
+    frame_alarms = expand_window_alarms(window_alarms, total_frames, FRAME_INTERVAL)
+    df = pd.DataFrame(frame_alarms, columns=events)
+    df.insert(0, 'frame', np.arange(total_frames))
+    return df
+
+
+# 프로세스 풀 워커 상태 (initializer에서 한 번만 전달받아 모든 비디오에서 재사용)
+_worker_state: Dict = {}
+
+
+def _init_alarm_worker(text_vectors: np.ndarray, alarm_engine: AlarmEngine, score_cache: Optional[SimilarityCache],
+                       tile_reduce: Optional[str] = None):
+    _worker_state['text_vectors'] = text_vectors
+    _worker_state['alarm_engine'] = alarm_engine
+    _worker_state['score_cache'] = score_cache
+    _worker_state['tile_reduce'] = tile_reduce
+
+
+def _alarm_worker(task: Dict) -> Tuple[int, List[Tuple[np.ndarray, np.ndarray]]]:
+    """비디오 하나의 알람 구간 계산 (save_csv_path가 있으면 CSV도 저장)"""
+    total_frames = task['total_frames']
+    score_cache = _worker_state['score_cache']
+    sim_matrix = score_cache.get(task['vector_path']) if score_cache is not None else None
+    if sim_matrix is None:
+        sim_matrix = tiled_similarity(load_vector(task['vector_path']), _worker_state['text_vectors'],
+                                      _worker_state['tile_reduce'])
+        if score_cache is not None:
+            score_cache.put(task['vector_path'], sim_matrix)
+
+    alarm_engine = _worker_state['alarm_engine']
+    window_alarms = alarm_engine.compute(sim_matrix)
+    if task['save_csv_path']:
+        expand_predictions(window_alarms, total_frames, alarm_engine.events).to_csv(task['save_csv_path'], index=False)
+    return total_frames, window_alarm_runs(window_alarms, total_frames, FRAME_INTERVAL)
+
 class EventDetector:
-    def __init__(self, config_path: str , model_name:str = None, token:str = None):
-        self.config = load_config(config_path)
-        self.macs = DevMACSCore.from_huggingface(token=token, repo_id=f"PIA-SPACE-LAB/{model_name}")
-        # self.macs = DevMACSCore(model_type="clip4clip_web")
+    def __init__(self, config_path: str , model_name:str = None, token:str = None, device: str = "cuda",
+                 trace_dir: Optional[str] = None, score_cache_dir: Optional[str] = None,
+                 score_cache_max_bytes: int = DEFAULT_MAX_BYTES, text_cache_dir: Optional[str] = None):
+        """
+        Args:
+            config_path: 프롬프트 CFG json 경로
+            model_name: PIA-SPACE-LAB 하위 모델 이름
+            token: 허깅페이스 토큰
+            device: 유사도 계산 장치 ("cuda", "cpu" 등 torch 장치 또는 GPU 없이 NumPy로 계산하는 "numpy")
+            trace_dir: 지정 시 알람 결정 과정을 비디오별 압축 파일로 기록 (기본값 None은 기록하지 않음)
+            score_cache_dir: 지정 시 유사도 행렬을 디스크에 캐시 (보통 models/{model}/vector/score)
+            score_cache_max_bytes: 유사도 캐시 폴더 최대 크기 (병렬 워커 전체에 적용)
+            text_cache_dir: 지정 시 문장별 텍스트 벡터를 캐시 (보통 models/{model}/vector/text)
+        """
+        self.device = device
+        self.model_name = model_name
+        self.token = token
+        # 모델과 텍스트 벡터는 처음 필요할 때 로드 (유사도 캐시가 모두 있으면 로드하지 않음)
+        self._macs = None
+        self._text_vectors = None
 
-        self.prompt_manager = PromptManager(config_path)
+        # 같은 CFG를 쓰는 소비자는 하나의 컴파일 결과를 공유
+        self.prompt_manager = get_prompt_manager(config_path)
+        self.config = self.prompt_manager.config
         self.sentences = self.prompt_manager.sentences
-        self.text_vectors = self.macs.get_text_vector(self.sentences)
-        
-    def process_and_save_predictions(self, vector_base_dir: str, label_base_dir: str, save_base_dir: str):
-        """비디오 벡터를 처리하고 결과를 CSV로 저장"""
-
-        # 전체 비디오 파일 수 계산
-        total_videos = sum(len([f for f in cust_listdir(os.path.join(vector_base_dir, d)) 
-                                if f.endswith('.npy')]) 
-                            for d in cust_listdir(vector_base_dir) 
-                            if os.path.isdir(os.path.join(vector_base_dir, d)))
-        pbar = tqdm(total=total_videos, desc="Processing videos")
-        
-        for category in cust_listdir(vector_base_dir):
-            category_path = os.path.join(vector_base_dir, category)
-            if not os.path.isdir(category_path):
-                continue
-            
-            # 저장 디렉토리 생성
-            save_category_dir = os.path.join(save_base_dir, category)
-            os.makedirs(save_category_dir, exist_ok=True)
-            
-            for file in cust_listdir(category_path):
-                if file.endswith('.npy'):
-                    video_name = os.path.splitext(file)[0]
-                    vector_path = os.path.join(category_path, file)
-                    
-                    # 라벨 파일 읽기
-                    label_path = os.path.join(label_base_dir, category, f"{video_name}.json")
-                    with open(label_path, 'r') as f:
-                        label_data = json.load(f)
-                        total_frames = label_data['video_info']['total_frame']
-                    
-                    # 예측 결과 생성 및 저장
-                    self._process_and_save_single_video(
-                        vector_path=vector_path,
-                        total_frames=total_frames,
-                        save_path=os.path.join(save_category_dir, f"{video_name}.csv")
-                    )
-                    pbar.update(1)
-        pbar.close()
-
-    def _process_and_save_single_video(self, vector_path: str, total_frames: int, save_path: str):
-        """단일 비디오 처리 및 저장"""
-        # 기본 예측 수행
-        sparse_predictions = self._process_single_vector(vector_path)
-        
-        # 데이터프레임으로 변환 및 확장
-        df = self._expand_predictions(sparse_predictions, total_frames)
-        
-        # CSV로 저장
-        df.to_csv(save_path, index=False)
-
-    def _process_single_vector(self, vector_path: str) -> Dict:
-        """기존 예측 로직"""
-        video_vector = np.load(vector_path)
-        processed_vectors = []
-        frame_interval = 15
-        
-        for vector in video_vector:
-            v = vector.squeeze(0)  # numpy array
-            v = torch.from_numpy(v).unsqueeze(0).cuda()  # torch tensor로 변환 후 GPU로
-            processed_vectors.append(v)
-        
-        frame_results = {}
-        for vector_idx, v in enumerate(processed_vectors):
-            actual_frame = vector_idx * frame_interval
+        self.alarm_engine = AlarmEngine.from_compiled(self.prompt_manager.compile())
+        # VIDEO_CFG.tile_size가 있으면 벡터는 (windows, tiles, ..., dim)이며 타일 점수를 축약해 사용
+        self.tile_reduce = tile_reduce_mode(self.config.get('VIDEO_CFG', {}))
+        self.trace = AlarmTrace(trace_dir, self.alarm_engine, self.sentences) if trace_dir else None
+        self.score_cache = None
+        if score_cache_dir:
+            backend = NUMPY_DEVICE if self.device == NUMPY_DEVICE else "torch"
+            if self.tile_reduce:
+                backend = f"{backend}:tile-{self.tile_reduce}"
+            self.score_cache = SimilarityCache(score_cache_dir, model_name, self.sentences,
+                                               backend=backend, max_bytes=score_cache_max_bytes)
+        self.text_cache = TextVectorCache(text_cache_dir, model_name) if text_cache_dir else None
+
+    @property
+    def macs(self) -> DevMACSCore:
+        if self._macs is None:
+            self._macs = get_model(f"PIA-SPACE-LAB/{self.model_name}", token=self.token)
+            # self._macs = DevMACSCore(model_type="clip4clip_web")
+        return self._macs
+
+    @property
+    def text_vectors(self):
+        # 텍스트 벡터는 한 번만 선택한 장치에 올려두고 모든 비디오에서 재사용
+        if self._text_vectors is None:
+            if self.text_cache is not None:
+                # 캐시에 없는 문장만 인코딩 (모두 있으면 모델을 로드하지 않음)
+                text_vectors = self.text_cache.get_text_vectors(
+                    self.sentences, lambda sentences: self.macs.get_text_vector(sentences))
+            else:
+                text_vectors = self.macs.get_text_vector(self.sentences)
+            self._text_vectors = self._place_text_vectors(text_vectors)
+        return self._text_vectors
+
+    @staticmethod
+    def _normalize_text_vectors(text_vectors) -> np.ndarray:
+        """NumPy 계산용 정규화된 (prompts, dim) 텍스트 벡터"""
+        if isinstance(text_vectors, torch.Tensor):
+            text_vectors = text_vectors.detach().float().cpu().numpy()
+        text_vectors = np.asarray(text_vectors, dtype=np.float32)
+        text_vectors = text_vectors.reshape(text_vectors.shape[0], -1)
+        return text_vectors / np.linalg.norm(text_vectors, axis=-1, keepdims=True)
+
+    def _place_text_vectors(self, text_vectors):
+        """텍스트 벡터를 계산 장치에 상주시킴 (numpy 모드는 정규화된 (prompts, dim) 배열)"""
+        if self.device == NUMPY_DEVICE:
+            return self._normalize_text_vectors(text_vectors)
+        if not isinstance(text_vectors, torch.Tensor):
+            text_vectors = torch.as_tensor(np.asarray(text_vectors))
+        return text_vectors.to(self.device)
+
+    def _compute_similarity_matrix(self, video_vector: np.ndarray) -> np.ndarray:
+        """
+        비디오 전체 윈도우와 모든 프롬프트의 유사도를 한 번에 계산
+
+        Args:
+            video_vector: (windows, 1, dim) 형태의 비디오 벡터 (타일링 시 (windows, tiles, ..., dim))
+
+        Returns:
+            np.ndarray: (windows, prompts) 유사도 행렬
+        """
+        if self.device == NUMPY_DEVICE:
+            return tiled_similarity(video_vector, self.text_vectors, self.tile_reduce)
+        if self.tile_reduce is None:
+            return self._torch_similarity(video_vector)
+        # 모든 타일을 한 번에 계산한 뒤 프롬프트별로 타일 점수 축약
+        sim_matrix = self._torch_similarity(flatten_tiles(video_vector))
+        return reduce_tile_scores(sim_matrix, video_vector.shape[1], self.tile_reduce)
+
+    def _torch_similarity(self, video_vector: np.ndarray) -> np.ndarray:
+        """(windows, ..., dim) 벡터와 모든 프롬프트의 (windows, prompts) 유사도 (torch 장치)"""
+        visual = dequantize(video_vector)
+        visual = visual.reshape(visual.shape[0], -1, visual.shape[-1])
+        with torch.no_grad():
+            visual = to_tensor(visual, self.device)
             sim_scores = loose_similarity(
-                sequence_output=self.text_vectors.cuda(),
-                visual_output=v.unsqueeze(1)
+                sequence_output=self.text_vectors,
+                visual_output=visual
             )
-            frame_results[actual_frame] = self._calculate_alarms(sim_scores)
-            
-        return frame_results
+        # loose_similarity는 (prompts, windows)를 반환
+        return sim_scores.t().float().cpu().numpy()
 
-    def _expand_predictions(self, sparse_predictions: Dict, total_frames: int) -> pd.DataFrame:
-        """예측을 전체 프레임으로 확장"""
-        # 카테고리 목록 추출 (첫 번째 프레임의 알람 결과에서)
-        first_frame = list(sparse_predictions.keys())[0]
-        categories = list(sparse_predictions[first_frame].keys())
-        
-        # 전체 프레임 생성
-        df = pd.DataFrame({'frame': range(total_frames)})
-        
-        # 각 카테고리에 대한 알람 값 초기화
-        for category in categories:
-            df[category] = 0
-        
-        # 예측값 채우기
-        frame_keys = sorted(sparse_predictions.keys())
-        for i in range(len(frame_keys)):
-            current_frame = frame_keys[i]
-            next_frame = frame_keys[i + 1] if i + 1 < len(frame_keys) else total_frames
-            
-            # 각 카테고리의 알람 값 설정
-            for category in categories:
-                alarm_value = sparse_predictions[current_frame][category]['alarm']
-                df.loc[current_frame:next_frame-1, category] = alarm_value
-        
-        return df
-
-
-    def _calculate_alarms(self, sim_scores: torch.Tensor) -> Dict:
-        """유사도 점수를 기반으로 각 이벤트의 알람 상태 계산"""
-        # 로거 설정
-        log_filename = f"alarm_calculation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        logging.basicConfig(
-            filename=log_filename,
-            level=logging.ERROR,
-            format='%(asctime)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        # logger = logging.getLogger(__name__)
-        
-        event_alarms = {}
-        
-        for event_config in self.config['PROMPT_CFG']:
-            event = event_config['event']
-            top_k = event_config['top_candidates']
-            threshold = event_config['alert_threshold']
-            
-            # logger.info(f"\nProcessing event: {event}")
-            # logger.info(f"Top K: {top_k}, Threshold: {threshold}")
-            
-            event_prompts = self._get_event_prompts(event)
-
-            # logger.debug(f"\nEvent Prompts Debug for {event}:")
-            # logger.debug(f"Indices: {event_prompts['indices']}")
-            # logger.debug(f"Types: {event_prompts['types']}")
-            # logger.debug(f"\nSim Scores Debug:")
-            # logger.debug(f"Shape: {sim_scores.shape}")
-            # logger.debug(f"Raw scores: {sim_scores}")
-
-            # event_scores = sim_scores[event_prompts['indices']]
-            event_scores = sim_scores[event_prompts['indices']].squeeze(-1)  # shape 변경
-        
-            # logger.debug(f"Event scores shape: {event_scores.shape}")
-            # logger.debug(f"Event scores: {event_scores}")
-            # 각 프롬프트와 점수 출력
-            # logger.info("\nDEBUG VALUES:")
-            # logger.info(f"event_scores: {event_scores}")
-            # logger.info(f"indices: {event_prompts['indices']}")
-            # logger.info(f"types: {event_prompts['types']}")
-
-            # logger.info("\nAll prompts and scores:")
-            # for idx, (score, prompt_type) in enumerate(zip(event_scores, event_prompts['types'])):
-            #     logger.info(f"Type: {prompt_type}, Score: {score.item():.4f}")
-            
-            top_k_values, top_k_indices = torch.topk(event_scores, min(top_k, len(event_scores)))
-        
-            # logger.info(f"top_k_values: {top_k_values}")
-            # logger.info(f"top_k_indices (raw): {top_k_indices}")
-            # Top K 결과 출력
-            # logger.info(f"\nTop {top_k} selections:")
-            for idx, (value, index) in enumerate(zip(top_k_values, top_k_indices)):
-                # indices[index]가 아닌 index를 직접 사용
-                prompt_type = event_prompts['types'][index]  # 수정된 부분
-                # logger.info(f"DEBUG: index={index}, types={event_prompts['types']}, selected_type={prompt_type}")
-                # logger.info(f"Rank {idx+1}: Type: {prompt_type}, Score: {value.item():.4f}")
-
-            abnormal_count = sum(1 for idx in top_k_indices 
-                    if event_prompts['types'][idx] == 'abnormal')  # 수정된 부분
-            # for idx, (value, orig_idx) in enumerate(zip(top_k_values, top_k_indices)):
-            #     prompt_type = event_prompts['types'][orig_idx.item()]
-            #     logger.info(f"Rank {idx+1}: Type: {prompt_type}, Score: {value.item():.4f}")
-            
-            # abnormal_count = sum(1 for idx in top_k_indices 
-            #                 if event_prompts['types'][idx.item()] == 'abnormal')
-            
-            # 알람 결정 과정 출력
-            # logger.info(f"\nAbnormal count: {abnormal_count}")
-            alarm_result = 1 if abnormal_count >= threshold else 0
-            # logger.info(f"Final alarm decision: {alarm_result}")
-            # logger.info("-" * 50)
-            
-            event_alarms[event] = {
-                'alarm': alarm_result,
-                'scores': top_k_values.tolist(),
-                'top_k_types': [event_prompts['types'][idx.item()] for idx in top_k_indices]
-            }
-        
-        # 로거 종료
-        logging.shutdown()
-                
-        return event_alarms
-
-    def _get_event_prompts(self, event: str) -> Dict:
-        indices = []
-        types = []
-        current_idx = 0
-        
-        for event_config in self.config['PROMPT_CFG']:
-            if event_config['event'] == event:
-                for status in ['normal', 'abnormal']:
-                    for _ in range(len(event_config['prompts'][status])):
-                        indices.append(current_idx)
-                        types.append(status)
-                        current_idx += 1
-                        
-        return {'indices': indices, 'types': types}
+    def process_and_save_predictions(self, vector_base_dir: str, label_base_dir: str, save_base_dir: str,
+                                     save_csv: bool = False, prefetch: int = DEFAULT_PREFETCH, num_workers: int = 1):
+        """
+        비디오 벡터를 처리하고 결과를 알람 구간 파일로 저장
+
+        Args:
+            vector_base_dir: 카테고리별 비디오 벡터(.npy) 폴더
+            label_base_dir: 카테고리별 라벨 json 폴더
+            save_base_dir: 알람 저장 폴더 ({save_base_dir}/alarm_intervals.npz)
+            save_csv: True면 기존 형식의 비디오별 프레임 CSV도 함께 저장
+            prefetch: 백그라운드에서 미리 읽어둘 비디오 벡터 수
+            num_workers: 비디오를 나눠 처리할 프로세스 수 (device="numpy"일 때만 사용, 1이면 순차 실행)
+        """
+        vector_files = list_vector_files(vector_base_dir)
+        # 레이블 인덱스가 있으면 비디오마다 json을 여는 대신 한 번만 읽음
+        label_store = LabelStore.load(label_base_dir) if LabelStore.exists(label_base_dir) else None
+        if num_workers > 1:
+            if self.device != NUMPY_DEVICE:
+                logger.warning(f"Parallel alarm generation requires device='{NUMPY_DEVICE}', running serially on {self.device}")
+            elif self.trace is not None:
+                logger.warning("Parallel alarm generation does not record traces, running serially")
+            else:
+                self._process_parallel(vector_files, label_store, label_base_dir, save_base_dir, save_csv,
+                                       num_workers)
+                return
+        loader = VectorLoader(vector_files, prefetch=prefetch, should_load=self.needs_vector)
+        alarm_store = AlarmIntervalStore(self.alarm_engine.events)
+
+        current_category = None
+        for vector_file, video_vector in tqdm(loader, total=len(loader), desc="Processing videos"):
+            if vector_file.category != current_category:
+                if self.trace and current_category is not None:
+                    self.trace.flush()
+                current_category = vector_file.category
+                # 저장 디렉토리 생성
+                if save_csv:
+                    os.makedirs(os.path.join(save_base_dir, current_category), exist_ok=True)
 
+            total_frames = self._total_frames(label_store, label_base_dir, vector_file)
+
+            # 예측 결과 생성 및 저장
+            window_alarms = self._process_single_vector(vector_file.path, video_vector)
+            alarm_store.add(vector_file.category, vector_file.video_name, total_frames, window_alarms, FRAME_INTERVAL)
+            if save_csv:
+                self._expand_predictions(window_alarms, total_frames).to_csv(
+                    os.path.join(save_base_dir, vector_file.category, f"{vector_file.video_name}.csv"), index=False)
+        if self.trace:
+            self.trace.flush()
+        alarm_store.save(save_base_dir)
+
+    @staticmethod
+    def _total_frames(label_store: Optional[LabelStore], label_base_dir: str, vector_file: VectorFile) -> int:
+        """비디오 전체 프레임 수 (레이블 인덱스에 없으면 라벨 json에서 읽음)"""
+        key = (vector_file.category, vector_file.video_name)
+        if label_store is not None and key in label_store:
+            return label_store.total_frames(*key)
+        label_path = os.path.join(label_base_dir, vector_file.category, f"{vector_file.video_name}.json")
+        with open(label_path, 'r') as f:
+            return json.load(f)['video_info']['total_frame']
+
+    def _process_parallel(self, vector_files: List[VectorFile], label_store: Optional[LabelStore],
+                          label_base_dir: str, save_base_dir: str, save_csv: bool, num_workers: int):
+        """비디오를 프로세스 풀에 나눠 알람 계산 후 순차 실행과 같은 형식으로 저장"""
+        tasks = []
+        for vector_file in vector_files:
+            save_csv_path = None
+            if save_csv:
+                os.makedirs(os.path.join(save_base_dir, vector_file.category), exist_ok=True)
+                save_csv_path = os.path.join(save_base_dir, vector_file.category, f"{vector_file.video_name}.csv")
+            tasks.append({
+                'vector_path': vector_file.path,
+                'total_frames': self._total_frames(label_store, label_base_dir, vector_file),
+                'save_csv_path': save_csv_path,
+            })
+
+        # 계획 시점에 캐시에 있던 항목도 다른 워커의 축출로 사라질 수 있으므로 텍스트 벡터는 항상 전달
+        # (text_cache_dir가 있으면 모델을 로드하지 않음)
+        text_vectors = self.text_vectors
+        alarm_store = AlarmIntervalStore(self.alarm_engine.events)
+        chunksize = max(1, len(tasks) // (num_workers * 4))
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_alarm_worker,
+                                 initargs=(text_vectors, self.alarm_engine, self.score_cache,
+                                           self.tile_reduce)) as executor:
+            results = executor.map(_alarm_worker, tasks, chunksize=chunksize)
+            for vector_file, (total_frames, runs) in tqdm(zip(vector_files, results), total=len(tasks),
+                                                          desc="Processing videos"):
+                alarm_store.add_runs(vector_file.category, vector_file.video_name, total_frames, runs)
+        alarm_store.save(save_base_dir)
+
+    def needs_vector(self, vector_file: VectorFile) -> bool:
+        """유사도 캐시에 없는 비디오만 벡터를 읽음"""
+        return self.score_cache is None or not self.score_cache.contains(vector_file.path)
+
+    def similarity(self, vector_path: str, video_vector: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        벡터 파일의 (windows, prompts) 유사도 행렬 (캐시가 있으면 캐시 사용, 없으면 계산 후 저장)
+
+        Args:
+            vector_path: 비디오 벡터 경로 (샤드 가상 경로 포함)
+            video_vector: 이미 읽은 벡터 (None이면 캐시에 없을 때만 vector_path에서 읽음)
+        """
+        if self.score_cache is not None:
+            sim_matrix = self.score_cache.get(vector_path)
+            if sim_matrix is not None:
+                return sim_matrix
+        if video_vector is None:
+            video_vector = load_vector(vector_path)
+        sim_matrix = self._compute_similarity_matrix(video_vector)
+        if self.score_cache is not None:
+            self.score_cache.put(vector_path, sim_matrix)
+        return sim_matrix
+
+    def _process_single_vector(self, vector_path: str, video_vector: Optional[np.ndarray] = None) -> np.ndarray:
+        """비디오 벡터 전체에 대한 윈도우별 알람 계산 (windows, events)"""
+        sim_matrix = self.similarity(vector_path, video_vector)
+        if self.trace is None:
+            return self._calculate_alarms(sim_matrix)
+
+        alarms, top_k_indices = self.alarm_engine.compute(sim_matrix, return_top_k=True)
+        self.trace.record(category=os.path.basename(os.path.dirname(vector_path)),
+                          video_name=os.path.splitext(os.path.basename(vector_path))[0],
+                          frames=np.arange(len(sim_matrix)) * FRAME_INTERVAL,
+                          sim_matrix=sim_matrix,
+                          alarms=alarms,
+                          top_k_indices=top_k_indices)
+        return alarms
+
+    def _expand_predictions(self, window_alarms: np.ndarray, total_frames: int) -> pd.DataFrame:
+        """예측을 전체 프레임으로 확장"""
+        return expand_predictions(window_alarms, total_frames, self.alarm_engine.events)
 
+    def _calculate_alarms(self, sim_matrix: np.ndarray) -> np.ndarray:
+        """유사도 행렬을 기반으로 모든 윈도우/이벤트의 알람 상태 계산"""
+        return self.alarm_engine.compute(sim_matrix)
@@ -0,0 +1,243 @@
+import os
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from pia_bench.video_reader import SampledFrameReader, DEFAULT_FRAME_SIZE
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+# 디코더 메시지 대기 중 디코더 프로세스 생존 여부를 확인하는 간격 (초)
+DECODER_POLL_SECONDS = 1.0
+# 디코더 종료/비디오 종료/오류 메시지 구분자
+_VIDEO_END = "end"
+_DECODER_DONE = "done"
+_DECODER_ERROR = "error"
+
+
+class StubEncoder:
+    """
+    모델 없이 파이프라인을 시험하기 위한 CPU 인코더입니다.
+
+    프레임을 grid×grid 블록 평균 색으로 줄인 뒤 고정 난수 행렬로 투영하여 (batch, dim) 벡터를 만듭니다.
+    """
+
+    def __init__(self, dim: int = 512, grid: int = 8, seed: int = 0):
+        self.dim = dim
+        self.grid = grid
+        self.projection = np.random.default_rng(seed).standard_normal((grid * grid * 3, dim)).astype(np.float32)
+
+    def __call__(self, frames: np.ndarray) -> np.ndarray:
+        batch, height, width, _ = frames.shape
+        grid = self.grid
+        cropped = frames[:, :height - height % grid, :width - width % grid].astype(np.float32)
+        pooled = cropped.reshape(batch, grid, height // grid, grid, width // grid, 3).mean(axis=(2, 4))
+        return pooled.reshape(batch, -1) @ self.projection
+
+
+def _decode_worker(task_queue, free_slots, filled, shm_name: str, slot_shape: Tuple[int, ...],
+                   time_sampling: int, frame_size: Tuple[int, int], tile_size):
+    """디코더 프로세스: 샘플 프레임(타일링 시 타일마다)을 빈 슬롯에 쓰고 (비디오, 프레임, 타일, 슬롯)만 전달"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        ring = np.ndarray((shm.size // int(np.prod(slot_shape)),) + slot_shape, dtype=np.uint8, buffer=shm.buf)
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            video_idx, video_path = task
+            try:
+                count = 0
+                reader = SampledFrameReader(video_path, time_sampling, frame_size, tile_size=tile_size)
+                for frame_idx, frame in reader:
+                    # 한 프레임의 타일은 연속된 슬롯으로 보내 같은 인코더 배치에 들어가도록 함
+                    for tile_idx, tile in enumerate(frame if reader.tiles else frame[None]):
+                        slot = free_slots.get()  # 빈 슬롯이 없으면 대기 (backpressure)
+                        ring[slot] = tile
+                        filled.put((video_idx, frame_idx, tile_idx, slot))
+                        count += 1
+                filled.put((_VIDEO_END, video_idx, count, reader.num_tiles))
+            except Exception as e:
+                filled.put((_DECODER_ERROR, video_idx, f"{video_path}: {str(e)}", None))
+        del ring
+    finally:
+        shm.close()
+        filled.put((_DECODER_DONE, None, None, None))
+
+
+def window_vectors(embeddings: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    샘플 프레임 임베딩을 윈도우 벡터로 묶음
+
+    Args:
+        embeddings: (frames, dim), 타일링 시 (frames, tiles, dim) 임베딩
+        window_size: 윈도우당 샘플 프레임 수 (VIDEO_CFG.window_size)
+
+    Returns:
+        np.ndarray: (windows, window_size, dim), 타일링 시 (windows, tiles, window_size, dim)
+            (윈도우 i는 샘플 프레임 i부터 window_size개이며 끝을 넘으면 마지막 프레임을 반복,
+            유사도 계산 시 window_size 축은 loose_similarity처럼 평균 풀링됨)
+    """
+    num_frames = len(embeddings)
+    indices = np.minimum(np.arange(num_frames)[:, None] + np.arange(window_size), num_frames - 1)
+    windows = embeddings[indices]
+    if embeddings.ndim == 3:
+        windows = windows.transpose(0, 2, 1, 3)
+    return windows
+
+
+class IngestPipeline:
+    """
+    비디오 디코딩과 프레임 임베딩을 겹쳐 실행하는 수집(ingestion) 파이프라인입니다.
+
+    - 디코더 프로세스 풀이 비디오를 나눠 SampledFrameReader로 샘플 프레임을 읽고
+      (VIDEO_CFG.tile_size가 있으면 프레임을 타일로 나눠 타일마다 슬롯 하나를 사용)
+    - 프레임은 공유 메모리 링 버퍼 슬롯에 직접 쓰며 큐에는 (비디오, 프레임 번호, 슬롯)만 보냅니다 (프레임 pickle 없음)
+    - 빈 슬롯 큐의 크기가 링 버퍼 크기로 제한되어 인코더가 밀리면 디코더가 대기합니다 (backpressure)
+    - 메인 프로세스는 고정 크기 배치를 만들어 인코더에 넣고, 비디오의 모든 프레임이 인코딩되면 결과를 내보냅니다
+
+    Note:
+        DevMACSCore는 프레임 배치 인코딩 API 없이 save_visual_results(비디오 폴더 단위)만 제공하므로
+        기본 벡터 추출은 save_visual_results를 사용합니다. 프레임 인코더를 직접 넘긴 경우에만
+        PiaBenchMarkSet.extract_missing_vectors(encoder=...)가 이 파이프라인으로 벡터를 추출합니다.
+
+    Example:
+        >>> pipeline = IngestPipeline(video_paths, config["VIDEO_CFG"], encoder=StubEncoder(), num_decoders=8)
+        >>> for video_path, frame_indices, embeddings in pipeline.run():
+        ...     vector = window_vectors(embeddings, config["VIDEO_CFG"]["window_size"])
+    """
+
+    def __init__(self, video_paths: List[str], video_cfg: Dict, encoder: Callable[[np.ndarray], np.ndarray],
+                 num_decoders: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 ring_slots: Optional[int] = None, frame_size: Tuple[int, int] = DEFAULT_FRAME_SIZE):
+        """
+        Args:
+            video_paths: 처리할 비디오 경로 목록
+            video_cfg: CFG의 VIDEO_CFG (time_sampling, tile_size 사용)
+            encoder: (batch, H, W, 3) uint8 RGB 프레임 -> (batch, dim) 임베딩 함수
+            num_decoders: 디코더 프로세스 수 (기본값은 CPU 수 - 1)
+            batch_size: 인코더 배치 크기 (마지막 배치는 0으로 채워 크기를 맞춤)
+            ring_slots: 공유 메모리 링 버퍼 프레임 슬롯 수 (기본값 batch_size * 4)
+            frame_size: (width, height) 인코더 입력 크기
+        """
+        self.video_paths = list(video_paths)
+        self.time_sampling = video_cfg.get('time_sampling', 15)
+        self.tile_size = video_cfg.get('tile_size')
+        self.encoder = encoder
+        self.num_decoders = num_decoders or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_size = batch_size
+        self.ring_slots = max(ring_slots or batch_size * 4, batch_size)
+        self.frame_size = tuple(frame_size)
+
+    def _encode(self, frames: np.ndarray, count: int) -> np.ndarray:
+        return np.asarray(self.encoder(frames))[:count]
+
+    def run(self) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+        """
+        (비디오 경로, 샘플 프레임 번호, 임베딩)을 비디오가 완료되는 순서대로 반환
+
+        임베딩은 (frames, dim), 타일링 시 (frames, tiles, dim)입니다.
+
+        Raises:
+            RuntimeError: 디코더에서 비디오를 읽지 못했거나 디코더 프로세스가 종료 신호 없이 죽은 경우
+                (OOM 종료, cv2 segfault 등)
+        """
+        width, height = self.frame_size
+        slot_shape = (height, width, 3)
+        slot_bytes = int(np.prod(slot_shape))
+        ctx = mp.get_context("spawn")
+        shm = shared_memory.SharedMemory(create=True, size=self.ring_slots * slot_bytes)
+        ring = np.ndarray((self.ring_slots,) + slot_shape, dtype=np.uint8, buffer=shm.buf)
+        task_queue, free_slots, filled = ctx.Queue(), ctx.Queue(), ctx.Queue()
+        for slot in range(self.ring_slots):
+            free_slots.put(slot)
+        for task in enumerate(self.video_paths):
+            task_queue.put(task)
+        num_decoders = min(self.num_decoders, max(1, len(self.video_paths)))
+        for _ in range(num_decoders):
+            task_queue.put(None)
+        decoders = [ctx.Process(target=_decode_worker,
+                                args=(task_queue, free_slots, filled, shm.name, slot_shape,
+                                      self.time_sampling, self.frame_size, self.tile_size), daemon=True)
+                    for _ in range(num_decoders)]
+        for decoder in decoders:
+            decoder.start()
+        logger.info(f"Ingesting {len(self.video_paths)} videos with {num_decoders} decoders, "
+                    f"batch {self.batch_size}, ring {self.ring_slots} slots")
+
+        batch = np.zeros((self.batch_size,) + slot_shape, dtype=np.uint8)
+        batch_keys: List[Tuple[int, Tuple[int, int]]] = []
+        received: Dict[int, List[Tuple[Tuple[int, int], np.ndarray]]] = {}
+        expected: Dict[int, Tuple[int, int]] = {}  # 비디오별 (전체 슬롯 수, 프레임당 타일 수)
+        done = 0
+
+        def _flush() -> List[int]:
+            """현재 배치 인코딩 후 모든 프레임이 인코딩된 비디오 목록 반환"""
+            if not batch_keys:
+                return []
+            batch[len(batch_keys):] = 0
+            embeddings = self._encode(batch, len(batch_keys))
+            for (video_idx, key), embedding in zip(batch_keys, embeddings):
+                received.setdefault(video_idx, []).append((key, embedding))
+            batch_keys.clear()
+            return [video_idx for video_idx, (count, _) in expected.items()
+                    if len(received.get(video_idx, [])) == count]
+
+        def _next_message() -> Tuple:
+            """디코더 메시지를 기다리며 종료 신호 없이 끝난 디코더가 있으면 RuntimeError"""
+            while True:
+                try:
+                    return filled.get(timeout=DECODER_POLL_SECONDS)
+                except queue.Empty:
+                    exited = [decoder for decoder in decoders if decoder.exitcode is not None]
+                    if len(exited) > done:
+                        exit_codes = [decoder.exitcode for decoder in exited]
+                        raise RuntimeError(f"Decoder process exited without finishing (exit codes {exit_codes})")
+
+        def _finish(video_idx: int) -> Tuple[str, np.ndarray, np.ndarray]:
+            items = sorted(received.pop(video_idx, []), key=lambda item: item[0])
+            _, num_tiles = expected.pop(video_idx)
+            frame_indices = np.array([frame_idx for (frame_idx, _), _ in items[::num_tiles]], dtype=np.int64)
+            if not items:
+                return self.video_paths[video_idx], frame_indices, np.zeros((0, 0), np.float32)
+            embeddings = np.stack([embedding for _, embedding in items])
+            if self.tile_size:
+                embeddings = embeddings.reshape((len(frame_indices), num_tiles) + embeddings.shape[1:])
+            return self.video_paths[video_idx], frame_indices, embeddings
+
+        try:
+            while done < num_decoders:
+                first, second, third, fourth = _next_message()
+                if first == _DECODER_DONE:
+                    done += 1
+                    continue
+                if first == _DECODER_ERROR:
+                    raise RuntimeError(f"Decoder failed on {third}")
+                if first == _VIDEO_END:
+                    expected[second] = (third, fourth)
+                    if len(received.get(second, [])) == third:
+                        yield _finish(second)
+                    continue
+
+                video_idx, frame_idx, tile_idx, slot = first, second, third, fourth
+                batch[len(batch_keys)] = ring[slot]
+                free_slots.put(slot)
+                batch_keys.append((video_idx, (frame_idx, tile_idx)))
+                if len(batch_keys) == self.batch_size:
+                    for finished in _flush():
+                        yield _finish(finished)
+
+            for finished in _flush():
+                yield _finish(finished)
+            for video_idx in list(expected):
+                yield _finish(video_idx)
+        finally:
+            for decoder in decoders:
+                if decoder.is_alive():
+                    decoder.terminate()
+                decoder.join()
+            del ring
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,185 @@
+import numpy as np
+from typing import List, Tuple
+
+
+def window_frame_lengths(num_windows: int, total_frames: int, frame_interval: int) -> np.ndarray:
+    """
+    윈도우별로 담당하는 프레임 수를 계산합니다.
+
+    윈도우 i는 [i * frame_interval, (i + 1) * frame_interval) 구간을 담당하고,
+    마지막 윈도우는 total_frames까지 확장됩니다. total_frames를 넘는 구간은 잘립니다.
+
+    Args:
+        num_windows (int): 윈도우 수
+        total_frames (int): 비디오 전체 프레임 수
+        frame_interval (int): 윈도우 간 프레임 간격
+
+    Returns:
+        np.ndarray: (windows,) 윈도우별 프레임 수. 윈도우가 1개 이상이면 합은 total_frames
+    """
+    starts = np.minimum(np.arange(num_windows, dtype=np.int64) * frame_interval, total_frames)
+    ends = np.append(starts[1:], total_frames)
+    return ends - starts
+
+
+def expand_window_alarms(window_alarms: np.ndarray, total_frames: int, frame_interval: int) -> np.ndarray:
+    """
+    윈도우 단위 알람을 프레임 단위로 확장합니다.
+
+    Args:
+        window_alarms (np.ndarray): (windows, events) 알람 배열
+        total_frames (int): 비디오 전체 프레임 수
+        frame_interval (int): 윈도우 간 프레임 간격
+
+    Returns:
+        np.ndarray: (total_frames, events) 프레임별 알람 배열
+
+    Example:
+        >>> expand_window_alarms(np.array([[1], [0]]), total_frames=5, frame_interval=2)[:, 0]
+        array([1, 1, 0, 0, 0])
+    """
+    window_alarms = np.asarray(window_alarms)
+    if len(window_alarms) == 0:
+        return np.zeros((total_frames,) + window_alarms.shape[1:], dtype=window_alarms.dtype)
+    lengths = window_frame_lengths(len(window_alarms), total_frames, frame_interval)
+    return np.repeat(window_alarms, lengths, axis=0)
+
+
+def mask_to_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    1차원 0/1 배열에서 값이 1인 연속 구간을 찾습니다.
+
+    Args:
+        mask (np.ndarray): (N,) 0/1 배열
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 구간 시작 인덱스, 구간 끝 인덱스 (끝은 포함하지 않음)
+
+    Example:
+        >>> mask_to_runs(np.array([0, 1, 1, 0, 1]))
+        (array([1, 4]), array([3, 5]))
+    """
+    padded = np.concatenate(([False], np.asarray(mask) != 0, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def window_alarm_runs(window_alarms: np.ndarray, total_frames: int,
+                      frame_interval: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    윈도우 단위 알람을 프레임 확장 없이 이벤트별 프레임 구간으로 변환합니다.
+
+    Args:
+        window_alarms (np.ndarray): (windows, events) 알람 배열
+        total_frames (int): 비디오 전체 프레임 수
+        frame_interval (int): 윈도우 간 프레임 간격
+
+    Returns:
+        List[Tuple[np.ndarray, np.ndarray]]: 이벤트별 (시작 프레임, 끝 프레임) 배열. 끝 프레임은 포함하지 않음
+
+    Note:
+        expand_window_alarms 결과에 mask_to_runs를 적용한 것과 동일합니다.
+    """
+    window_alarms = np.asarray(window_alarms)
+    lengths = window_frame_lengths(len(window_alarms), total_frames, frame_interval)
+    bounds = np.concatenate(([0], np.cumsum(lengths)))
+    runs = []
+    for event_idx in range(window_alarms.shape[1]):
+        # 길이 0인 윈도우(영상 끝을 넘는 윈도우)는 구간에서 제외
+        starts, ends = mask_to_runs(window_alarms[:, event_idx] * (lengths > 0))
+        frame_starts, frame_ends = bounds[starts], bounds[ends]
+        keep = frame_ends > frame_starts
+        runs.append((frame_starts[keep], frame_ends[keep]))
+    return runs
+
+
+def runs_to_mask(starts: np.ndarray, ends: np.ndarray, total_frames: int) -> np.ndarray:
+    """
+    [start, end) 구간들을 프레임별 0/1 배열로 변환합니다.
+
+    Args:
+        starts (np.ndarray): 구간 시작 프레임
+        ends (np.ndarray): 구간 끝 프레임 (포함하지 않음)
+        total_frames (int): 비디오 전체 프레임 수
+
+    Returns:
+        np.ndarray: (total_frames,) 0/1 배열 (uint8)
+    """
+    diff = np.zeros(total_frames + 1, dtype=np.int64)
+    np.add.at(diff, np.clip(starts, 0, total_frames), 1)
+    np.add.at(diff, np.clip(ends, 0, total_frames), -1)
+    return (np.cumsum(diff[:-1]) > 0).astype(np.uint8)
+
+
+def merge_runs(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    겹치거나 정렬되지 않은 [start, end) 구간들을 정렬된 서로소 구간으로 병합합니다.
+
+    Example:
+        >>> merge_runs(np.array([5, 0, 2]), np.array([8, 3, 4]))
+        (array([0, 5]), array([4, 8]))
+    """
+    starts, ends = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+    valid = ends > starts
+    starts, ends = starts[valid], ends[valid]
+    if len(starts) == 0:
+        return starts, ends
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], np.maximum.accumulate(ends[order])
+    is_new = np.ones(len(starts), dtype=bool)
+    is_new[1:] = starts[1:] > ends[:-1]
+    group_last = np.append(np.flatnonzero(is_new)[1:] - 1, len(starts) - 1)
+    return starts[is_new], ends[group_last]
+
+
+def covered_length(starts: np.ndarray, ends: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    정렬된 서로소 구간들이 [0, position) 안에서 차지하는 프레임 수를 계산합니다.
+
+    Args:
+        starts (np.ndarray): 정렬된 서로소 구간 시작
+        ends (np.ndarray): 구간 끝 (포함하지 않음)
+        positions (np.ndarray): 조회할 프레임 위치
+
+    Returns:
+        np.ndarray: positions와 같은 모양의 누적 길이
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    if len(starts) == 0:
+        return np.zeros_like(positions)
+    prefix = np.concatenate(([0], np.cumsum(ends - starts)))
+    idx = np.searchsorted(starts, positions, side='right') - 1
+    safe_idx = np.maximum(idx, 0)
+    covered = prefix[safe_idx] + np.minimum(positions, ends[safe_idx]) - starts[safe_idx]
+    return np.where(idx >= 0, covered, 0)
+
+
+def overlap_length(a_starts: np.ndarray, a_ends: np.ndarray, b_starts: np.ndarray, b_ends: np.ndarray) -> int:
+    """두 서로소 구간 집합이 겹치는 프레임 수 (O((n + m) log n))"""
+    if len(a_starts) == 0 or len(b_starts) == 0:
+        return 0
+    return int(np.sum(covered_length(a_starts, a_ends, b_ends) - covered_length(a_starts, a_ends, b_starts)))
+
+
+def run_confusion_counts(label_runs: Tuple[np.ndarray, np.ndarray], pred_runs: Tuple[np.ndarray, np.ndarray],
+                         total_frames: int) -> Tuple[int, int, int, int]:
+    """
+    정답/예측 구간으로 프레임 단위 혼동행렬을 프레임 확장 없이 계산합니다.
+
+    Args:
+        label_runs: 정답 (시작, 끝) 구간 (겹쳐도 됨)
+        pred_runs: 예측 (시작, 끝) 구간 (겹쳐도 됨)
+        total_frames (int): 비디오 전체 프레임 수
+
+    Returns:
+        Tuple[int, int, int, int]: (tp, tn, fp, fn)
+    """
+    label_starts, label_ends = merge_runs(np.clip(label_runs[0], 0, total_frames), np.clip(label_runs[1], 0, total_frames))
+    pred_starts, pred_ends = merge_runs(np.clip(pred_runs[0], 0, total_frames), np.clip(pred_runs[1], 0, total_frames))
+    positives = int(np.sum(label_ends - label_starts))
+    predicted = int(np.sum(pred_ends - pred_starts))
+    tp = overlap_length(label_starts, label_ends, pred_starts, pred_ends)
+    fp = predicted - tp
+    fn = positives - tp
+    tn = int(total_frames) - tp - fp - fn
+    return tp, tn, fp, fn
@@ -0,0 +1,168 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from tqdm import tqdm
+from utils.parser import load_config
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+LABEL_MANIFEST_FILE = "label_manifest.json"
+
+
+def build_frame_labels(label_data: Dict, total_frames: int, categories: List[str]) -> pd.DataFrame:
+    """
+    클립 구간으로부터 프레임별 레이블 데이터프레임 생성 (차분 배열 + 누적합)
+
+    Args:
+        label_data: 레이블 json 내용
+        total_frames: 총 프레임 수
+        categories: 레이블 컬럼으로 사용할 카테고리 목록 (정렬하여 사용, 목록에 없는 클립은 무시)
+
+    Returns:
+        pd.DataFrame: frame + 카테고리별 0/1 컬럼
+
+    Note:
+        클립 timestamp [start, end]는 양 끝을 포함하며 [0, total_frames) 범위로 잘립니다.
+    """
+    columns = sorted(categories)
+    column_index = {category: idx for idx, category in enumerate(columns)}
+    clips = [clip for clip in label_data['clips'].values() if clip['category'] in column_index]
+
+    diff = np.zeros((total_frames + 1, len(columns)), dtype=np.int32)
+    if clips:
+        cols = np.array([column_index[clip['category']] for clip in clips], dtype=np.intp)
+        timestamps = np.array([clip['timestamp'] for clip in clips], dtype=np.int64).reshape(-1, 2)
+        starts = np.clip(timestamps[:, 0], 0, total_frames)
+        ends = np.clip(timestamps[:, 1] + 1, 0, total_frames)
+        valid = starts < ends
+        np.add.at(diff, (starts[valid], cols[valid]), 1)
+        np.add.at(diff, (ends[valid], cols[valid]), -1)
+    labels = (np.cumsum(diff[:total_frames], axis=0) > 0).astype(np.int64)
+
+    df = pd.DataFrame(labels, columns=columns)
+    df.insert(0, 'frame', np.arange(total_frames))
+    return df
+
+
+def file_sha1(path: str) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def _convert_label_file(task: Tuple[str, str, List[str]]) -> str:
+    """json 하나를 프레임 CSV로 변환하고 json 해시 반환 (프로세스 풀 워커)"""
+    json_path, csv_path, categories = task
+    label_info = load_config(json_path)
+    df = build_frame_labels(label_info, label_info['video_info']['total_frame'], categories)
+    df.to_csv(csv_path, index=False)
+    return file_sha1(json_path)
+
+
+class LabelConverter:
+    """
+    dataset/{category}/{video}.json 레이블을 프레임 CSV로 변환하는 클래스입니다.
+
+    dataset 폴더의 label_manifest.json에 json별 (mtime, size, sha1)과 변환에 사용한 카테고리 목록을 기록하고,
+    새로 생겼거나 내용이 바뀐 json만 프로세스 풀로 다시 변환합니다.
+    mtime만 바뀌고 내용(sha1)이 같은 json은 manifest만 갱신합니다.
+
+    Example:
+        >>> converter = LabelConverter(dataset_path, categories, num_workers=8)
+        >>> converted = converter.convert(["fire/video1.json", "fire/video2.json"])
+    """
+
+    def __init__(self, dataset_path: str, categories: List[str], num_workers: int = 1):
+        self.dataset_path = dataset_path
+        self.categories = sorted(categories)
+        self.num_workers = num_workers
+        self.manifest_path = os.path.join(dataset_path, LABEL_MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {'categories': self.categories, 'files': {}}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable label manifest {self.manifest_path}: {str(e)}")
+            return {'categories': self.categories, 'files': {}}
+        if manifest.get('categories') != self.categories:
+            # 레이블 컬럼 구성이 바뀌면 모든 CSV를 다시 만들어야 함
+            logger.info("Label categories changed, reconverting all label files")
+            return {'categories': self.categories, 'files': {}}
+        return manifest
+
+    def _save_manifest(self, manifest: Dict):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _needs_conversion(self, json_file: str, stat: os.stat_result, entry: Optional[Dict],
+                          manifest_is_new: bool) -> Tuple[bool, Optional[str]]:
+        """(변환 필요 여부, 변환 없이 manifest에 기록할 sha1)"""
+        json_path = os.path.join(self.dataset_path, json_file)
+        csv_path = os.path.splitext(json_path)[0] + '.csv'
+        if not os.path.exists(csv_path):
+            return True, None
+        if entry is None:
+            # manifest 도입 이전에 변환된 CSV는 json보다 새로우면 최신으로 간주
+            if manifest_is_new and os.stat(csv_path).st_mtime_ns >= stat.st_mtime_ns:
+                return False, file_sha1(json_path)
+            return True, None
+        if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return False, entry['sha1']
+        sha1 = file_sha1(json_path)
+        return sha1 != entry['sha1'], sha1
+
+    def convert(self, json_files: List[str]) -> List[str]:
+        """
+        변경된 json만 CSV로 변환
+
+        Args:
+            json_files: dataset 기준 상대 경로 목록 ({category}/{video}.json)
+
+        Returns:
+            List[str]: 새로 변환한 json 목록
+        """
+        manifest_is_new = not os.path.exists(self.manifest_path)
+        manifest = self._load_manifest()
+        files = manifest['files']
+        new_files = {}
+        tasks, task_files, stats = [], [], {}
+        for json_file in json_files:
+            stat = os.stat(os.path.join(self.dataset_path, json_file))
+            stats[json_file] = stat
+            needed, sha1 = self._needs_conversion(json_file, stat, files.get(json_file), manifest_is_new)
+            if needed:
+                json_path = os.path.join(self.dataset_path, json_file)
+                tasks.append((json_path, os.path.splitext(json_path)[0] + '.csv', self.categories))
+                task_files.append(json_file)
+            else:
+                new_files[json_file] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1}
+
+        if tasks:
+            if self.num_workers <= 1 or len(tasks) <= 1:
+                hashes = [_convert_label_file(task) for task in tqdm(tasks, desc="Converting labels")]
+            else:
+                chunksize = max(1, len(tasks) // (self.num_workers * 4))
+                with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+                    hashes = list(tqdm(executor.map(_convert_label_file, tasks, chunksize=chunksize),
+                                       total=len(tasks), desc="Converting labels"))
+            for json_file, sha1 in zip(task_files, hashes):
+                stat = stats[json_file]
+                new_files[json_file] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1}
+            logger.info(f"Converted {len(tasks)}/{len(json_files)} JSON label files")
+        else:
+            logger.info("All JSON label files are up to date. No further processing needed.")
+
+        # 삭제된 json은 manifest에서도 제거
+        self._save_manifest({'categories': self.categories, 'files': new_files})
+        return task_files
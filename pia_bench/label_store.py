@@ -0,0 +1,202 @@
+import os
+import json
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from pia_bench.intervals import merge_runs, runs_to_mask
+from utils.except_dir import cust_listdir
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+LABEL_INDEX_FILE = "label_index.npz"
+EMPTY_RUNS = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+
+def clip_runs(label_data: Dict, total_frames: int) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    레이블 json의 clip들을 카테고리별 병합된 [start, end) 프레임 구간으로 변환
+
+    Note:
+        timestamp는 [start, end] 양끝 포함이므로 [start, end + 1)로 바꾼 뒤 [0, total_frames)로 자릅니다.
+    """
+    clips = {}
+    for clip in label_data.get('clips', {}).values():
+        clips.setdefault(clip['category'], []).append(clip['timestamp'])
+    runs = {}
+    for event, timestamps in clips.items():
+        timestamps = np.array(timestamps, dtype=np.int64).reshape(-1, 2)
+        runs[event] = merge_runs(np.clip(timestamps[:, 0], 0, total_frames),
+                                 np.clip(timestamps[:, 1] + 1, 0, total_frames))
+    return runs
+
+
+class LabelStore:
+    """
+    벤치마크의 모든 레이블 json을 하나의 컬럼형 파일로 모은 레이블 인덱스입니다.
+
+    비디오마다 json/csv를 여는 대신 dataset 폴더의 label_index.npz 하나만 읽어
+    total_frames, fps, 카테고리별 clip 구간을 제공합니다.
+    clip 구간은 [start, end) 반열린 구간으로 [0, total_frames)에 맞춰 자르고 병합해 저장합니다.
+    build는 json의 (mtime, size)가 바뀐 비디오만 다시 읽습니다.
+
+    저장 구조 ({dataset_path}/label_index.npz):
+        - categories, videos, total_frames, fps, mtime_ns, size: (V,) 비디오별 정보
+        - clip_categories: (K,) clip 카테고리 이름
+        - clip_video, clip_category, clip_start, clip_end: (C,) 병합된 clip 구간
+
+    Example:
+        >>> store = LabelStore.build(pia_benchmark.dataset_path)
+        >>> store = LabelStore.load(pia_benchmark.dataset_path)
+        >>> starts, ends = store.get_runs("fire", "video1", "fire")
+    """
+
+    def __init__(self):
+        self._videos: Dict[Tuple[str, str], Dict] = {}
+
+    @staticmethod
+    def exists(dataset_path: str) -> bool:
+        return os.path.isfile(os.path.join(dataset_path, LABEL_INDEX_FILE))
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._videos
+
+    def __len__(self) -> int:
+        return len(self._videos)
+
+    def categories(self) -> List[str]:
+        return list(dict.fromkeys(category for category, _ in self._videos))
+
+    def videos(self, category: str) -> List[str]:
+        return [video for cat, video in self._videos if cat == category]
+
+    def total_frames(self, category: str, video_name: str) -> int:
+        return self._videos[(category, video_name)]['total_frames']
+
+    def fps(self, category: str, video_name: str) -> float:
+        return self._videos[(category, video_name)]['fps']
+
+    def get_runs(self, category: str, video_name: str, event: str) -> Tuple[np.ndarray, np.ndarray]:
+        """이벤트(clip 카테고리)의 병합된 (시작, 끝) 프레임 구간"""
+        return self._videos[(category, video_name)]['runs'].get(event, EMPTY_RUNS)
+
+    def to_frame_array(self, category: str, video_name: str, events: List[str]) -> np.ndarray:
+        """(total_frames, events) 프레임별 0/1 정답 배열 (레이블 csv와 동일)"""
+        total_frames = self.total_frames(category, video_name)
+        columns = [runs_to_mask(*self.get_runs(category, video_name, event), total_frames) for event in events]
+        if not columns:
+            return np.zeros((total_frames, 0), dtype=np.uint8)
+        return np.stack(columns, axis=1)
+
+    @staticmethod
+    def _parse(json_path: str, stat: os.stat_result) -> Dict:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            label_data = json.load(f)
+        video_info = label_data['video_info']
+        total_frames = int(video_info['total_frame'])
+        return {
+            'total_frames': total_frames,
+            'fps': float(video_info.get('fps', np.nan)),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'runs': clip_runs(label_data, total_frames),
+        }
+
+    @classmethod
+    def build(cls, dataset_path: str, json_files: Optional[List[str]] = None) -> "LabelStore":
+        """
+        레이블 인덱스를 갱신하여 저장 (json이 바뀐 비디오만 다시 읽음)
+
+        Args:
+            dataset_path: 카테고리별 레이블 json 폴더
+            json_files: dataset 기준 상대 경로 목록 ({category}/{video}.json, 기본값은 전체 탐색)
+        """
+        if json_files is None:
+            json_files = [os.path.join(category, f)
+                          for category in cust_listdir(dataset_path)
+                          if os.path.isdir(os.path.join(dataset_path, category))
+                          for f in cust_listdir(os.path.join(dataset_path, category)) if f.endswith('.json')]
+
+        previous = cls.load(dataset_path) if cls.exists(dataset_path) else cls()
+        store = cls()
+        parsed = 0
+        for json_file in json_files:
+            category = os.path.dirname(json_file)
+            video_name = os.path.splitext(os.path.basename(json_file))[0]
+            json_path = os.path.join(dataset_path, json_file)
+            stat = os.stat(json_path)
+            entry = previous._videos.get((category, video_name))
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                entry = cls._parse(json_path, stat)
+                parsed += 1
+            store._videos[(category, video_name)] = entry
+
+        if parsed or len(store) != len(previous):
+            store.save(dataset_path)
+        logger.info(f"Label index: parsed {parsed}, reused {len(store) - parsed} videos")
+        return store
+
+    def save(self, dataset_path: str) -> str:
+        keys = list(self._videos)
+        entries = [self._videos[key] for key in keys]
+        clip_categories = sorted({event for entry in entries for event in entry['runs']})
+        category_index = {event: idx for idx, event in enumerate(clip_categories)}
+        clip_video, clip_category, clip_start, clip_end = [], [], [], []
+        for video_idx, entry in enumerate(entries):
+            for event, (starts, ends) in entry['runs'].items():
+                clip_video.append(np.full(len(starts), video_idx, dtype=np.int32))
+                clip_category.append(np.full(len(starts), category_index[event], dtype=np.int16))
+                clip_start.append(starts)
+                clip_end.append(ends)
+
+        def _concat(arrays, dtype):
+            return np.concatenate(arrays).astype(dtype) if arrays else np.zeros(0, dtype=dtype)
+
+        save_path = os.path.join(dataset_path, LABEL_INDEX_FILE)
+        tmp_path = f"{save_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                categories=np.array([category for category, _ in keys]),
+                videos=np.array([video for _, video in keys]),
+                total_frames=np.array([entry['total_frames'] for entry in entries], dtype=np.int64),
+                fps=np.array([entry['fps'] for entry in entries], dtype=np.float64),
+                mtime_ns=np.array([entry['mtime_ns'] for entry in entries], dtype=np.int64),
+                size=np.array([entry['size'] for entry in entries], dtype=np.int64),
+                clip_categories=np.array(clip_categories),
+                clip_video=_concat(clip_video, np.int32),
+                clip_category=_concat(clip_category, np.int16),
+                clip_start=_concat(clip_start, np.int64),
+                clip_end=_concat(clip_end, np.int64),
+            )
+        os.replace(tmp_path, save_path)
+        logger.info(f"Saved label index for {len(keys)} videos to {save_path}")
+        return save_path
+
+    @classmethod
+    def load(cls, dataset_path: str) -> "LabelStore":
+        """레이블 인덱스 파일을 한 번 읽어 메모리에 복원"""
+        with np.load(os.path.join(dataset_path, LABEL_INDEX_FILE)) as data:
+            arrays = {key: data[key] for key in data.files}
+
+        store = cls()
+        clip_categories = arrays['clip_categories'].tolist()
+        order = np.lexsort((arrays['clip_start'], arrays['clip_category'], arrays['clip_video']))
+        clip_video = arrays['clip_video'][order]
+        clip_category = arrays['clip_category'][order]
+        clip_start, clip_end = arrays['clip_start'][order], arrays['clip_end'][order]
+        bounds = np.searchsorted(clip_video, np.arange(len(arrays['videos']) + 1))
+
+        for video_idx, key in enumerate(zip(arrays['categories'].tolist(), arrays['videos'].tolist())):
+            lo, hi = bounds[video_idx], bounds[video_idx + 1]
+            runs = {}
+            for category_idx in np.unique(clip_category[lo:hi]):
+                select = slice(lo + np.searchsorted(clip_category[lo:hi], category_idx),
+                               lo + np.searchsorted(clip_category[lo:hi], category_idx, side='right'))
+                runs[clip_categories[category_idx]] = (clip_start[select], clip_end[select])
+            store._videos[key] = {
+                'total_frames': int(arrays['total_frames'][video_idx]),
+                'fps': float(arrays['fps'][video_idx]),
+                'mtime_ns': int(arrays['mtime_ns'][video_idx]),
+                'size': int(arrays['size'][video_idx]),
+                'runs': runs,
+            }
+        return store
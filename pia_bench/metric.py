@@ -1,23 +1,299 @@
 import os
 import pandas as pd
 import numpy as np
-from sklearn.metrics import f1_score, accuracy_score, precision_score, recall_score
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
 import json
+import hashlib
 from utils.except_dir import cust_listdir
+from pia_bench.alarm_store import AlarmIntervalStore
+from pia_bench.label_store import LabelStore
+from pia_bench.intervals import run_confusion_counts, runs_to_mask
+from utils.parser import load_config
+from enviroments.config import ALL_METRICS
 from utils.logger import custom_logger
 logger = custom_logger(__name__)
+
+FRAME_MODE = "frame"
+INTERVAL_MODE = "interval"
+# 혼동행렬 배열의 마지막 축 순서
+COUNT_NAMES = ['tp', 'tn', 'fp', 'fn']
+# 비디오별 지표 컬럼 순서 (기존 CSV처럼 f1을 맨 앞에 둠)
+VIDEO_METRICS = ['f1'] + [name for name in ALL_METRICS if name != 'f1']
+METRIC_CACHE_FILE = "metric_cache.json"
+
+
+def _file_signature(path: str) -> str:
+    """파일 크기와 수정 시각으로 만든 서명"""
+    stat = os.stat(path)
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def confusion_counts(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    """
+    (frames, events) 정답/예측 배열의 모든 이벤트 혼동행렬을 bincount 한 번으로 계산합니다.
+
+    Args:
+        y_true (np.ndarray): (frames, events) 0/1 정답
+        y_pred (np.ndarray): (frames, events) 0/1 예측
+
+    Returns:
+        np.ndarray: (events, 4) [tp, tn, fp, fn]
+    """
+    y_true = np.asarray(y_true).reshape(len(y_true), -1)
+    y_pred = np.asarray(y_pred).reshape(len(y_pred), -1)
+    num_events = y_true.shape[1]
+    # 이벤트별 코드: 0=tn, 1=fp, 2=fn, 3=tp
+    codes = 2 * (y_true == 1) + (y_pred == 1) + 4 * np.arange(num_events)
+    counts = np.bincount(codes.ravel(), minlength=4 * num_events).reshape(num_events, 4)
+    return counts[:, [3, 0, 1, 2]]
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """분모가 0이면 0을 반환하는 나눗셈"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator > 0)
+
+
+def metrics_from_counts(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    혼동행렬로 config.ALL_METRICS의 모든 지표를 벡터 연산으로 계산합니다.
+
+    Args:
+        counts (np.ndarray): (..., 4) [tp, tn, fp, fn]
+
+    Returns:
+        Dict[str, np.ndarray]: 지표 이름 -> (...) 값 (tp/tn/fp/fn 포함)
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    tp, tn, fp, fn = (counts[..., i] for i in range(4))
+    recall = _safe_divide(tp, tp + fn)
+    specificity = _safe_divide(tn, tn + fp)
+    metrics = {
+        'f1': _safe_divide(2 * tp, 2 * tp + fp + fn),
+        'accuracy': _safe_divide(tp + tn, tp + tn + fp + fn),
+        'precision': _safe_divide(tp, tp + fp),
+        'recall': recall,
+        'specificity': specificity,
+        'balanced_accuracy': (recall + specificity) / 2,
+        'g_mean': np.sqrt(recall * specificity),
+        'mcc': _safe_divide(tp * tn - fp * fn,
+                            np.sqrt(((tp + fp) * (tp + fn)).astype(np.float64) * ((tn + fp) * (tn + fn)))),
+        'npv': _safe_divide(tn, tn + fn),
+        'far': 1 - specificity,
+    }
+    for name, value in zip(COUNT_NAMES, (tp, tn, fp, fn)):
+        metrics[name] = value
+    return metrics
+
+
+def video_confusion_counts(task: Dict) -> Tuple[List[str], np.ndarray]:
+    """
+    비디오 한 개의 이벤트별 혼동행렬을 계산합니다. (프로세스 풀 작업 단위)
+
+    Args:
+        task (Dict): MetricsEvaluator._collect_tasks가 만든 작업 정보
+            - mode: "frame" 또는 "interval"
+            - label_path: 정답 csv(frame) 또는 json(interval) 경로
+            - label_runs: 레이블 인덱스의 이벤트별 정답 구간 (있으면 label_path 대신 사용)
+            - pred_csv: 예측 csv 경로 (csv 기반 frame 모드)
+            - pred_runs, total_frames: 이벤트별 알람 구간과 전체 프레임 수 (구간 파일 기반)
+
+    Returns:
+        Tuple[List[str], np.ndarray]: 이벤트 목록, (events, 4) [tp, tn, fp, fn]
+    """
+    if 'label_runs' in task:
+        events = list(task['pred_runs'])
+        if task['mode'] == INTERVAL_MODE:
+            counts = [run_confusion_counts(task['label_runs'][event], runs, task['total_frames'])
+                      for event, runs in task['pred_runs'].items()]
+            return events, np.array(counts, dtype=np.int64).reshape(-1, 4)
+        total_frames = task['total_frames']
+        label_values = np.stack([runs_to_mask(*task['label_runs'][event], total_frames) for event in events], axis=1)
+        pred_values = np.stack([runs_to_mask(starts, ends, total_frames)
+                                for starts, ends in task['pred_runs'].values()], axis=1)
+        return events, confusion_counts(label_values, pred_values)
+
+    if task['mode'] == INTERVAL_MODE:
+        clips = load_config(task['label_path'])['clips'].values()
+        counts = []
+        for event, runs in task['pred_runs'].items():
+            # timestamp는 [start, end] 양끝 포함 -> [start, end + 1)
+            timestamps = np.array([clip['timestamp'] for clip in clips if clip['category'] == event],
+                                  dtype=np.int64).reshape(-1, 2)
+            label_runs = (timestamps[:, 0], timestamps[:, 1] + 1)
+            counts.append(run_confusion_counts(label_runs, runs, task['total_frames']))
+        return list(task['pred_runs']), np.array(counts, dtype=np.int64).reshape(-1, 4)
+
+    if 'pred_csv' in task:
+        pred_df = pd.read_csv(task['pred_csv'])
+        events = [col for col in pred_df.columns if col != 'frame']
+        pred_values = pred_df[events].values
+    else:
+        events = list(task['pred_runs'])
+        pred_values = np.stack([runs_to_mask(starts, ends, task['total_frames'])
+                                for starts, ends in task['pred_runs'].values()], axis=1)
+    label_df = pd.read_csv(task['label_path'])
+    # 모든 이벤트의 혼동행렬을 한 번에 계산
+    return events, confusion_counts(label_df[events].values, pred_values)
+
+
 class MetricsEvaluator:
-    def __init__(self, pred_dir: str, label_dir: str, save_dir: str):
+    def __init__(self, pred_dir: str, label_dir: str, save_dir: str, mode: str = FRAME_MODE, num_workers: int = 1,
+                 use_cache: bool = True):
         """
         Args:
-            pred_dir: 예측 csv 파일들이 있는 디렉토리 경로
-            label_dir: 정답 csv 파일들이 있는 디렉토리 경로 
+            pred_dir: 알람 구간 파일(alarm_intervals.npz) 또는 예측 csv 파일들이 있는 디렉토리 경로
+            label_dir: 정답 csv(frame 모드) 또는 json(interval 모드) 파일들이 있는 디렉토리 경로 
             save_dir: 결과를 저장할 디렉토리 경로
+            mode: "frame"은 프레임 배열 비교, "interval"은 라벨 json의 clip 구간과 알람 구간을
+                직접 연산 (구간 파일이 필요하며 없으면 frame 모드로 동작)
+            num_workers: 비디오별 평가에 사용할 프로세스 수 (1이면 현재 프로세스에서 순차 실행)
+            use_cache: 비디오별 혼동행렬을 save_dir/metric_cache.json에 저장하고
+                예측/정답 입력이 바뀐 비디오만 다시 계산
         """
         self.pred_dir = pred_dir
         self.label_dir = label_dir
         self.save_dir = save_dir
+        # 구간 파일이 있으면 한 번만 읽고 카테고리/비디오별 csv 대신 사용
+        self.alarm_store = AlarmIntervalStore.load(pred_dir) if AlarmIntervalStore.exists(pred_dir) else None
+        # 레이블 인덱스가 있으면 구간 파일과 함께 비디오별 정답 파일 대신 사용
+        self.label_store = None
+        if self.alarm_store is not None and LabelStore.exists(label_dir):
+            self.label_store = LabelStore.load(label_dir)
+        self.mode = mode
+        if self.mode == INTERVAL_MODE and self.alarm_store is None:
+            logger.warning(f"Alarm interval file not found in {pred_dir}, falling back to frame mode")
+            self.mode = FRAME_MODE
+        self.num_workers = num_workers
+        self.use_cache = use_cache
+        self.cache_path = os.path.join(save_dir, METRIC_CACHE_FILE)
+        self._cache = None
+
+    def _pred_categories(self) -> List[str]:
+        """예측 결과가 있는 카테고리 목록"""
+        if self.alarm_store is not None:
+            return self.alarm_store.categories()
+        return [category for category in cust_listdir(self.pred_dir)
+                if os.path.isdir(os.path.join(self.pred_dir, category))]
+
+    def _collect_tasks(self, category: str, pred_path: str, label_path: str) -> List[Dict]:
+        """카테고리의 비디오별 평가 작업 목록 (정답 파일이 없는 비디오는 제외)"""
+        label_ext = '.json' if self.mode == INTERVAL_MODE else '.csv'
+        tasks = []
+        if self.alarm_store is not None:
+            videos = self.alarm_store.videos(category)
+        else:
+            videos = [os.path.splitext(f)[0] for f in cust_listdir(pred_path) if f.endswith('.csv')]
+
+        for video_name in videos:
+            if self.label_store is not None and (category, video_name) in self.label_store:
+                pred_runs = self.alarm_store.get_runs(category, video_name)
+                tasks.append({'mode': self.mode, 'category': category, 'video_name': video_name,
+                              'pred_runs': pred_runs,
+                              'total_frames': self.alarm_store.total_frames(category, video_name),
+                              'label_runs': {event: self.label_store.get_runs(category, video_name, event)
+                                             for event in pred_runs}})
+                continue
+
+            # 해당 비디오의 정답 파일 확인
+            label_path_full = os.path.join(label_path, f"{video_name}{label_ext}")
+            if not os.path.exists(label_path_full):
+                logger.warning(f"Warning: Label file not found for {video_name}")
+                continue
+
+            task = {'mode': self.mode, 'category': category, 'video_name': video_name,
+                    'label_path': label_path_full}
+            if self.alarm_store is not None:
+                task['pred_runs'] = self.alarm_store.get_runs(category, video_name)
+                task['total_frames'] = self.alarm_store.total_frames(category, video_name)
+            else:
+                task['pred_csv'] = os.path.join(pred_path, f"{video_name}.csv")
+            tasks.append(task)
+        return tasks
+
+    def _compute_tasks(self, tasks: List[Dict]) -> List[Tuple[List[str], np.ndarray]]:
+        """작업 순서를 유지하며 혼동행렬 계산 (num_workers > 1이면 프로세스 풀 사용)"""
+        if self.num_workers <= 1 or len(tasks) <= 1:
+            return [video_confusion_counts(task) for task in tasks]
+        chunksize = max(1, len(tasks) // (self.num_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            return list(executor.map(video_confusion_counts, tasks, chunksize=chunksize))
+
+    def _run_tasks(self, tasks: List[Dict], prune_cache: bool = False) -> List[Tuple[List[str], np.ndarray]]:
+        """
+        캐시를 확인하여 입력이 바뀐 비디오만 다시 계산합니다.
+
+        Args:
+            tasks: 평가 작업 목록
+            prune_cache: True면 tasks에 없는 비디오의 캐시 항목을 삭제 (전체 평가 시)
+        """
+        if not self.use_cache:
+            return self._compute_tasks(tasks)
+
+        cache = self._load_cache()
+        keys = [f"{task['category']}/{task['video_name']}" for task in tasks]
+        fingerprints = [self._task_fingerprint(task) for task in tasks]
+        results = [None] * len(tasks)
+        stale = []
+        for i, (key, fingerprint) in enumerate(zip(keys, fingerprints)):
+            entry = cache.get(key)
+            if entry is not None and entry['fingerprint'] == fingerprint:
+                results[i] = (entry['events'], np.array(entry['counts'], dtype=np.int64).reshape(-1, 4))
+            else:
+                stale.append(i)
+
+        for i, (events, counts) in zip(stale, self._compute_tasks([tasks[i] for i in stale])):
+            results[i] = (events, counts)
+            cache[keys[i]] = {'fingerprint': fingerprints[i], 'events': events, 'counts': counts.tolist()}
+        logger.info(f"Metric cache: reused {len(tasks) - len(stale)}, recomputed {len(stale)} videos")
+
+        if prune_cache:
+            current = set(keys)
+            for key in [key for key in cache if key not in current]:
+                del cache[key]
+        if stale or prune_cache:
+            self._save_cache(cache)
+        return results
+
+    def _task_fingerprint(self, task: Dict) -> str:
+        """예측/정답 입력의 지문 (예측 구간 내용 해시 또는 파일 크기/수정시각)"""
+        digest = hashlib.sha1(task['mode'].encode())
+        if 'pred_runs' in task:
+            digest.update(str(task['total_frames']).encode())
+            for event, (starts, ends) in task['pred_runs'].items():
+                digest.update(event.encode())
+                digest.update(np.ascontiguousarray(starts, dtype=np.int64).tobytes())
+                digest.update(np.ascontiguousarray(ends, dtype=np.int64).tobytes())
+        else:
+            digest.update(_file_signature(task['pred_csv']).encode())
+        if 'label_runs' in task:
+            for event, (starts, ends) in task['label_runs'].items():
+                digest.update(f"label:{event}".encode())
+                digest.update(np.ascontiguousarray(starts, dtype=np.int64).tobytes())
+                digest.update(np.ascontiguousarray(ends, dtype=np.int64).tobytes())
+        else:
+            digest.update(_file_signature(task['label_path']).encode())
+        return digest.hexdigest()
+
+    def _load_cache(self) -> Dict:
+        if self._cache is None:
+            self._cache = {}
+            if os.path.exists(self.cache_path):
+                try:
+                    self._cache = load_config(self.cache_path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable metric cache {self.cache_path}: {str(e)}")
+        return self._cache
+
+    def _save_cache(self, cache: Dict):
+        os.makedirs(self.save_dir, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.cache_path)
         
     def evaluate(self) -> Dict:
         """전체 평가 수행"""
@@ -31,17 +307,23 @@ class MetricsEvaluator:
         # 모든 카테고리의 metrics를 저장할 DataFrame 리스트
         all_categories_metrics = []
 
-        for category in cust_listdir(self.pred_dir):
-            if not os.path.isdir(os.path.join(self.pred_dir, category)):
-                continue
-                
-            pred_category_path = os.path.join(self.pred_dir, category)
-            label_category_path = os.path.join(self.label_dir, category)
+        # 모든 카테고리의 비디오 작업을 모아 한 번에 계산 (카테고리/비디오 순서 유지)
+        categories = self._pred_categories()
+        category_tasks = [self._collect_tasks(category,
+                                              os.path.join(self.pred_dir, category),
+                                              os.path.join(self.label_dir, category))
+                          for category in categories]
+        all_results = self._run_tasks([task for tasks in category_tasks for task in tasks], prune_cache=True)
+
+        offset = 0
+        for category, tasks in zip(categories, category_tasks):
             save_category_path = os.path.join(self.save_dir, category)
             os.makedirs(save_category_path, exist_ok=True)
             
             # 결과 저장을 위한 데이터프레임 생성
-            metrics_df = self._evaluate_category(category, pred_category_path, label_category_path)
+            results = all_results[offset:offset + len(tasks)]
+            offset += len(tasks)
+            metrics_df = self._build_metrics_df(tasks, results)
 
             metrics_df['category'] = category
 
@@ -164,38 +446,17 @@ class MetricsEvaluator:
 
     def _evaluate_category(self, category: str, pred_path: str, label_path: str) -> pd.DataFrame:
         """카테고리별 평가 수행"""
-        results = []
+        tasks = self._collect_tasks(category, pred_path, label_path)
+        return self._build_metrics_df(tasks, self._run_tasks(tasks))
+
+    def _build_metrics_df(self, tasks: List[Dict], results: List[Tuple[List[str], np.ndarray]]) -> pd.DataFrame:
+        """비디오별 혼동행렬로 메트릭 데이터프레임(+ 평균 행) 생성"""
+        rows = []
         metrics_columns = ['video_name']
         
-        for pred_file in cust_listdir(pred_path):
-            if not pred_file.endswith('.csv'):
-                continue
-                
-            video_name = os.path.splitext(pred_file)[0]
-            pred_df = pd.read_csv(os.path.join(pred_path, pred_file))
-            
-            # 해당 비디오의 정답 CSV 파일 로드
-            label_file = f"{video_name}.csv"
-            label_path_full = os.path.join(label_path, label_file)
-            
-            if not os.path.exists(label_path_full):
-                logger.warning(f"Warning: Label file not found for {video_name}")
-                continue
-                
-            label_df = pd.read_csv(label_path_full)
-            
-            # 각 카테고리별 메트릭 계산
-            video_metrics = {'video_name': video_name}
-            categories = [col for col in pred_df.columns if col != 'frame']
-            
-            for cat in categories:
-                # 정답값과 예측값
-                y_true = label_df[cat].values
-                y_pred = pred_df[cat].values
-                
-                # 메트릭 계산
-                metrics = self._calculate_metrics(y_true, y_pred)
-                
+        for task, (events, counts) in zip(tasks, results):
+            video_metrics = {'video_name': task['video_name']}
+            for cat, metrics in self._event_metrics(events, counts):
                 # 결과 저장
                 for metric_name, value in metrics.items():
                     col_name = f"{cat}_{metric_name}"
@@ -203,10 +464,10 @@ class MetricsEvaluator:
                     if col_name not in metrics_columns:
                         metrics_columns.append(col_name)
             
-            results.append(video_metrics)
+            rows.append(video_metrics)
         
         # 결과를 데이터프레임으로 변환
-        metrics_df = pd.DataFrame(results, columns=metrics_columns)
+        metrics_df = pd.DataFrame(rows, columns=metrics_columns)
         
         # 평균 계산하여 추가
         avg_metrics = {'video_name': 'average'}
@@ -216,6 +477,16 @@ class MetricsEvaluator:
         metrics_df = pd.concat([metrics_df, pd.DataFrame([avg_metrics])], ignore_index=True)
         
         return metrics_df
+
+    def _event_metrics(self, events: List[str], counts: np.ndarray) -> List:
+        """(events, 4) 혼동행렬을 [(이벤트, {지표: 값})] 형태로 변환"""
+        metrics = metrics_from_counts(counts)
+        event_metrics = []
+        for event_idx, event in enumerate(events):
+            values = {name: float(metrics[name][event_idx]) for name in VIDEO_METRICS}
+            values.update({name: int(metrics[name][event_idx]) for name in COUNT_NAMES})
+            event_metrics.append((event, values))
+        return event_metrics
     
 
     def calculate_accumulated_metrics(self, all_categories_metrics_df: pd.DataFrame) -> Dict:
@@ -286,23 +557,3 @@ class MetricsEvaluator:
         }
         
         return accumulated_results
-    def _calculate_metrics(self, y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
-        """성능 지표 계산"""
-        tn = np.sum((y_true == 0) & (y_pred == 0))
-        fp = np.sum((y_true == 0) & (y_pred == 1))
-        fn = np.sum((y_true == 1) & (y_pred == 0))
-        tp = np.sum((y_true == 1) & (y_pred == 1))
-        
-        metrics = {
-            'f1': f1_score(y_true, y_pred, zero_division=0),
-            'accuracy': accuracy_score(y_true, y_pred),
-            'precision': precision_score(y_true, y_pred, zero_division=0),
-            'recall': recall_score(y_true, y_pred, zero_division=0),
-            'specificity': tn / (tn + fp) if (tn + fp) > 0 else 0,
-            'tp': int(tp),
-            'tn': int(tn),
-            'fp': int(fp),
-            'fn': int(fn)
-        }
-        
-        return metrics
\ No newline at end of file
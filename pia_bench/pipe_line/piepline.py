@@ -1,6 +1,6 @@
 from pia_bench.checker.bench_checker import BenchChecker
 from pia_bench.event_alarm import EventDetector
-from pia_bench.metric import MetricsEvaluator
+from pia_bench.metric import MetricsEvaluator, INTERVAL_MODE
 from sheet_manager.sheet_crud.sheet_crud import SheetManager
 from pia_bench.bench_set import PiaBenchMarkSet
 from dotenv import load_dotenv
@@ -10,7 +10,7 @@ from typing import Dict, Tuple
 from dataclasses import dataclass
 from sheet_manager.sheet_checker.sheet_check import SheetChecker
 from utils.logger import custom_logger
-from enviroments.config import BASE_BENCH_PATH
+from enviroments.config import BASE_BENCH_PATH, NUM_WORKERS
 logger = custom_logger(__name__)
 load_dotenv()
 @dataclass
@@ -144,7 +144,9 @@ class BenchmarkPipeline:
         print("Categories identified:", pia_benchmark.categories)
         metric = MetricsEvaluator(pred_dir=pia_benchmark.alram_path, 
                         label_dir=pia_benchmark.dataset_path, 
-                        save_dir=pia_benchmark.metric_path)
+                        save_dir=pia_benchmark.metric_path,
+                        mode=INTERVAL_MODE,
+                        num_workers=NUM_WORKERS)
         
         self.bench_result_dict = metric.evaluate()
 
@@ -161,17 +163,22 @@ class BenchmarkPipeline:
         pia_benchmark.preprocess_label_to_csv()  
         print("Categories identified:", pia_benchmark.categories)
 
-        pia_benchmark.extract_visual_vector()
+        # 누락된 비디오만 추출하고 데이터셋에 없는 벡터는 격리
+        pia_benchmark.extract_missing_vectors()
 
         detector = EventDetector(config_path=self.config.cfg_target_path, 
                                  model_name=self.config.model_name , 
-                                 token=pia_benchmark.token)
+                                 token=pia_benchmark.token,
+                                 score_cache_dir=pia_benchmark.vector_score_path,
+                                 text_cache_dir=pia_benchmark.vector_text_path)
         detector.process_and_save_predictions(pia_benchmark.vector_video_path, 
                                             pia_benchmark.dataset_path, 
                                             pia_benchmark.alram_path)
         metric = MetricsEvaluator(pred_dir=pia_benchmark.alram_path, 
                                 label_dir=pia_benchmark.dataset_path, 
-                                save_dir=pia_benchmark.metric_path)
+                                save_dir=pia_benchmark.metric_path,
+                                mode=INTERVAL_MODE,
+                                num_workers=NUM_WORKERS)
         
         self.bench_result_dict = metric.evaluate()
 
@@ -191,13 +198,17 @@ class BenchmarkPipeline:
 
         detector = EventDetector(config_path=self.config.cfg_target_path, 
                                  model_name=self.config.model_name , 
-                                 token=pia_benchmark.token)
+                                 token=pia_benchmark.token,
+                                 score_cache_dir=pia_benchmark.vector_score_path,
+                                 text_cache_dir=pia_benchmark.vector_text_path)
         detector.process_and_save_predictions(pia_benchmark.vector_video_path, 
                                             pia_benchmark.dataset_path, 
                                             pia_benchmark.alram_path)
         metric = MetricsEvaluator(pred_dir=pia_benchmark.alram_path, 
                                 label_dir=pia_benchmark.dataset_path, 
-                                save_dir=pia_benchmark.metric_path)
+                                save_dir=pia_benchmark.metric_path,
+                                mode=INTERVAL_MODE,
+                                num_workers=NUM_WORKERS)
         
         self.bench_result_dict = metric.evaluate()
 
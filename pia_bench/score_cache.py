@@ -0,0 +1,174 @@
+import os
+import json
+import fcntl
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+from typing import List, Optional
+from pia_bench.vector_shard import shard_fingerprint, split_shard_path
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3  # 10GB
+# 여러 프로세스가 공유하는 잠금 파일과 캐시 전체 크기 기록 파일
+LOCK_FILE = ".lock"
+SIZE_FILE = ".size"
+
+
+def file_fingerprint(path: str) -> str:
+    """파일 경로, 크기, 수정 시각으로 만든 지문 (샤드 가상 경로는 항목 크기와 추가 시각)"""
+    if split_shard_path(path) is not None:
+        return shard_fingerprint(path)
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def sentences_hash(sentences: List[str]) -> str:
+    """프롬프트 문장 목록(순서 포함)의 해시"""
+    return hashlib.sha1(json.dumps(list(sentences), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SimilarityCache:
+    """
+    (windows × prompts) 유사도 행렬을 디스크에 저장하는 LRU 캐시입니다.
+
+    키는 모델 이름, 프롬프트 문장 해시, 계산 방식, 비디오 벡터 파일 지문으로 만들고
+    각 항목은 {cache_dir}/{key}.npy 로 저장되어 mmap으로 읽습니다.
+    조회 시 수정 시각을 갱신하고, 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다.
+    전체 크기는 {cache_dir}/.size에 기록하고 {cache_dir}/.lock 파일 잠금 아래에서 갱신하므로,
+    num_workers > 1로 여러 프로세스가 같은 폴더에 저장해도 max_bytes는 폴더 전체에 적용됩니다.
+
+    Example:
+        >>> cache = SimilarityCache("models/MSRVTT/vector/score", "MSRVTT", sentences)
+        >>> scores = cache.get(vector_path)
+        >>> if scores is None:
+        ...     cache.put(vector_path, compute(vector_path))
+    """
+
+    def __init__(self, cache_dir: str, model_name: str, sentences: List[str], backend: str = "",
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 캐시 폴더 (보통 models/{model}/vector/score)
+            model_name: 모델 이름
+            sentences: 프롬프트 문장 목록
+            backend: 유사도 계산 방식 구분자 (점수 스케일이 다른 계산 결과가 섞이지 않도록 키에 포함)
+            max_bytes: 캐시 폴더 최대 크기
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._prefix = f"{model_name}:{sentences_hash(sentences)}:{backend}"
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 시작 시 폴더를 다시 스캔하여 기록된 전체 크기를 실제 상태로 맞춤
+        with self._locked():
+            self._write_total(self._evict())
+
+    def _path(self, vector_path: str) -> str:
+        key = hashlib.sha1(f"{self._prefix}:{file_fingerprint(vector_path)}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def contains(self, vector_path: str) -> bool:
+        return os.path.exists(self._path(vector_path))
+
+    def get(self, vector_path: str) -> Optional[np.ndarray]:
+        """캐시된 유사도 행렬을 읽기 전용 mmap으로 반환 (없으면 None)"""
+        path = self._path(vector_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            scores = np.load(path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable similarity cache {path}: {str(e)}")
+            self._remove(path)
+            return None
+        os.utime(path)  # LRU 순서 갱신
+        return scores
+
+    def put(self, vector_path: str, scores: np.ndarray):
+        """유사도 행렬 저장 후 폴더 전체 용량 초과 시 오래된 항목 삭제"""
+        path = self._path(vector_path)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(scores, dtype=np.float32))
+        with self._locked():
+            added = os.path.getsize(tmp_path) - self._size(path)
+            os.replace(tmp_path, path)
+            total = self._read_total() + added
+            if total > self.max_bytes:
+                total = self._evict(keep=path)
+            self._write_total(total)
+
+    @contextmanager
+    def _locked(self):
+        """캐시 폴더 잠금 (같은 폴더를 쓰는 모든 프로세스가 공유)"""
+        with open(os.path.join(self.cache_dir, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_total(self) -> int:
+        try:
+            with open(os.path.join(self.cache_dir, SIZE_FILE)) as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return sum(size for _, size, _ in self._scan())
+
+    def _write_total(self, total: int):
+        with open(os.path.join(self.cache_dir, SIZE_FILE), 'w') as f:
+            f.write(str(total))
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _scan(self) -> List[tuple]:
+        """캐시 항목 (경로, 크기, 마지막 사용 시각) 목록"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _remove(self, path: str):
+        with self._locked():
+            removed = self._size(path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                removed = 0
+            self._write_total(max(0, self._read_total() - removed))
+
+    def _evict(self, keep: Optional[str] = None) -> int:
+        """
+        폴더를 다시 스캔하여 max_bytes 이하가 될 때까지 오래된 항목 삭제 (잠금 안에서 호출)
+
+        Returns:
+            int: 삭제 후 폴더 전체 크기
+        """
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return total
+        removed = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        logger.info(f"Evicted {removed} similarity cache entries from {self.cache_dir}")
+        return total
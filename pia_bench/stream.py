@@ -0,0 +1,239 @@
+import os
+import time
+import queue
+import threading
+import numpy as np
+from typing import Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from pia_bench.alarm_engine import AlarmEngine
+from pia_bench.event_alarm import EventDetector, FRAME_INTERVAL, tiled_similarity
+from pia_bench.vector_loader import VectorFile, load_vector
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_LATENCY = 0.05  # 초
+# 입력 스레드가 피드 종료(또는 예외)를 알리는 표시
+_FEED_END = object()
+
+
+class AlarmTransition(NamedTuple):
+    stream_id: Hashable
+    event: str
+    frame: int      # 상태가 바뀌는 프레임 (알람 구간 [on, off))
+    alarm: int      # 1: 알람 시작, 0: 알람 종료
+
+
+class _StreamState:
+    """스트림당 상태 (처리한 윈도우 수와 이벤트별 현재 알람)"""
+    __slots__ = ('windows', 'alarms')
+
+    def __init__(self, num_events: int):
+        self.windows = 0
+        self.alarms = np.zeros(num_events, dtype=np.uint8)
+
+
+def _read_feed(feed: Iterable, items: queue.Queue):
+    """피드를 읽어 큐에 넣는 입력 스레드 (끝나면 (_FEED_END, 예외 또는 None))"""
+    try:
+        for item in feed:
+            items.put(item)
+        items.put((_FEED_END, None))
+    except BaseException as e:
+        items.put((_FEED_END, e))
+
+
+class StreamAlarmer:
+    """
+    실시간으로 들어오는 윈도우 임베딩에 배치 모드와 같은 프롬프트/top-k/threshold 로직을 적용하는 클래스입니다.
+
+    여러 스트림의 윈도우를 모아 한 번의 행렬곱과 AlarmEngine.compute로 처리하고,
+    스트림마다 이전 알람 상태만 유지하여 이벤트별 알람 시작/종료(전이)만 내보냅니다.
+    대기 중인 윈도우가 max_batch개가 되거나 가장 오래된 윈도우가 max_latency초를 넘으면 바로 처리합니다.
+
+    Example:
+        >>> alarmer = StreamAlarmer.from_detector(detector)
+        >>> for transition in alarmer.run(simulate_feed(list_vector_files(vector_dir))):
+        ...     print(transition)
+    """
+
+    def __init__(self, text_vectors: np.ndarray, alarm_engine: AlarmEngine,
+                 max_batch: int = DEFAULT_MAX_BATCH, max_latency: float = DEFAULT_MAX_LATENCY,
+                 tile_reduce: Optional[str] = None):
+        """
+        Args:
+            text_vectors: (prompts, dim) 정규화된 텍스트 벡터
+            alarm_engine: 알람 엔진
+            max_batch: 한 번에 처리할 최대 윈도우 수
+            max_latency: 윈도우가 처리되기 전 최대 대기 시간 (초)
+            tile_reduce: 윈도우 벡터가 (tiles, ..., dim)일 때 타일 점수 축약 방식 ("max", "mean")
+        """
+        self.text_vectors = text_vectors
+        self.alarm_engine = alarm_engine
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.tile_reduce = tile_reduce
+        self._states: Dict[Hashable, _StreamState] = {}
+        self._pending: List[Tuple[Hashable, np.ndarray]] = []
+        self._oldest: Optional[float] = None
+
+    @classmethod
+    def from_detector(cls, detector: EventDetector, **kwargs) -> "StreamAlarmer":
+        """EventDetector의 텍스트 벡터와 알람 엔진으로 생성"""
+        kwargs.setdefault('tile_reduce', detector.tile_reduce)
+        return cls(EventDetector._normalize_text_vectors(detector.text_vectors), detector.alarm_engine, **kwargs)
+
+    @property
+    def num_streams(self) -> int:
+        return len(self._states)
+
+    def push(self, stream_id: Hashable, window_vector: np.ndarray) -> List[AlarmTransition]:
+        """
+        스트림의 다음 윈도우 임베딩 추가
+
+        Returns:
+            List[AlarmTransition]: 배치 조건을 만족해 처리된 경우의 알람 전이 (아니면 빈 리스트)
+        """
+        if stream_id not in self._states:
+            self._states[stream_id] = _StreamState(len(self.alarm_engine.events))
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        self._pending.append((stream_id, window_vector))
+        if len(self._pending) >= self.max_batch or time.monotonic() - self._oldest >= self.max_latency:
+            return self.flush()
+        return []
+
+    def poll(self) -> List[AlarmTransition]:
+        """입력이 없는 동안에도 max_latency가 지난 윈도우를 처리"""
+        if self._pending and time.monotonic() - self._oldest >= self.max_latency:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[AlarmTransition]:
+        """대기 중인 모든 윈도우를 한 번에 처리하고 알람 전이 반환"""
+        if not self._pending:
+            return []
+        stream_ids = [stream_id for stream_id, _ in self._pending]
+        # 타일링 시 윈도우마다 (tiles, frames, dim)으로 맞춰 모든 타일을 한 번에 계산
+        lead = (lambda vector: (np.shape(vector)[0], -1)) if self.tile_reduce else (lambda vector: (-1,))
+        visual = np.stack([np.reshape(vector, lead(vector) + (np.shape(vector)[-1],)) for _, vector in self._pending])
+        self._pending = []
+        self._oldest = None
+
+        alarms = self.alarm_engine.compute(tiled_similarity(visual, self.text_vectors, self.tile_reduce))
+        transitions = []
+        for stream_id, window_alarms in zip(stream_ids, alarms):
+            state = self._states[stream_id]
+            changed = np.flatnonzero(window_alarms != state.alarms)
+            frame = state.windows * FRAME_INTERVAL
+            for event_idx in changed:
+                transitions.append(AlarmTransition(stream_id, self.alarm_engine.events[event_idx],
+                                                   frame, int(window_alarms[event_idx])))
+            state.alarms = window_alarms.copy()
+            state.windows += 1
+        return transitions
+
+    def close(self, stream_id: Hashable) -> List[AlarmTransition]:
+        """스트림 종료: 남은 윈도우를 처리하고 켜져 있는 알람을 마지막 프레임에서 종료"""
+        transitions = self.flush()
+        state = self._states.pop(stream_id, None)
+        if state is None:
+            return transitions
+        frame = state.windows * FRAME_INTERVAL
+        for event_idx in np.flatnonzero(state.alarms):
+            transitions.append(AlarmTransition(stream_id, self.alarm_engine.events[event_idx], frame, 0))
+        return transitions
+
+    def run(self, feed: Iterable[Tuple[Hashable, Optional[np.ndarray]]]) -> Iterator[AlarmTransition]:
+        """
+        (stream_id, window_vector) 입력을 받아 알람 전이를 내보내는 제너레이터
+
+        피드는 별도 스레드에서 읽고, 가장 오래된 대기 윈도우의 max_latency까지만 입력을 기다리므로
+        피드가 멈추거나 입력이 드문 동안에도 대기 중인 윈도우는 max_latency 안에 처리됩니다.
+
+        Args:
+            feed: window_vector가 None이면 해당 스트림 종료
+        """
+        items: queue.Queue = queue.Queue(maxsize=self.max_batch)
+        threading.Thread(target=_read_feed, args=(feed, items), daemon=True).start()
+        while True:
+            timeout = None
+            if self._oldest is not None:
+                timeout = max(0.0, self._oldest + self.max_latency - time.monotonic())
+            try:
+                stream_id, window_vector = items.get(timeout=timeout)
+            except queue.Empty:
+                yield from self.poll()
+                continue
+            if stream_id is _FEED_END:
+                if window_vector is not None:
+                    raise window_vector
+                break
+            if window_vector is None:
+                yield from self.close(stream_id)
+            else:
+                yield from self.push(stream_id, window_vector)
+        yield from self.flush()
+        for stream_id in list(self._states):
+            yield from self.close(stream_id)
+
+
+def simulate_feed(vector_files: List[VectorFile], num_streams: Optional[int] = None,
+                  realtime: bool = False) -> Iterator[Tuple[str, Optional[np.ndarray]]]:
+    """
+    비디오 벡터 파일들로 동시 스트림을 흉내내는 입력 생성
+
+    최대 num_streams개의 비디오를 동시에 열어 윈도우를 번갈아 내보내고,
+    끝난 비디오는 (stream_id, None)으로 종료한 뒤 다음 비디오를 엽니다.
+
+    Args:
+        vector_files: 사용할 벡터 파일 목록 (stream_id는 "{category}/{video_name}")
+        num_streams: 동시 스트림 수 (기본값은 전체 파일 수)
+        realtime: True면 윈도우 간격(FRAME_INTERVAL 프레임, 30fps 기준)만큼 라운드마다 대기
+    """
+    num_streams = num_streams or len(vector_files)
+    remaining = iter(vector_files)
+    active: List[Tuple[str, np.ndarray, int]] = []
+
+    def _open():
+        vector_file = next(remaining, None)
+        if vector_file is not None:
+            active.append((f"{vector_file.category}/{vector_file.video_name}", load_vector(vector_file.path), 0))
+
+    for _ in range(num_streams):
+        _open()
+    while active:
+        round_start = time.monotonic()
+        next_active = []
+        for stream_id, vectors, position in active:
+            yield stream_id, vectors[position]
+            if position + 1 < len(vectors):
+                next_active.append((stream_id, vectors, position + 1))
+            else:
+                yield stream_id, None
+        active[:] = next_active
+        while len(active) < num_streams:
+            before = len(active)
+            _open()
+            if len(active) == before:
+                break
+        if realtime:
+            time.sleep(max(0.0, FRAME_INTERVAL / 30 - (time.monotonic() - round_start)))
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from pia_bench.bench_set import PiaBenchMarkSet
+    from pia_bench.vector_loader import list_vector_files
+    load_dotenv()
+
+    access_token = os.getenv("ACCESS_TOKEN")
+    model_name = "T2V_CLIP4CLIP_MSRVTT"
+    benchmark_path = "/home/jungseoik/data/Abnormal_situation_leader_board/assets/PIA"
+    cfg_target_path = "/home/jungseoik/data/Abnormal_situation_leader_board/assets/PIA/CFG/topk.json"
+
+    pia_benchmark = PiaBenchMarkSet(benchmark_path, model_name=model_name, cfg_target_path=cfg_target_path, token=access_token)
+    detector = EventDetector(config_path=cfg_target_path, model_name=model_name, token=access_token,
+                             text_cache_dir=pia_benchmark.vector_text_path)
+    alarmer = StreamAlarmer.from_detector(detector)
+    for transition in alarmer.run(simulate_feed(list_vector_files(pia_benchmark.vector_video_path), num_streams=100)):
+        print(transition)
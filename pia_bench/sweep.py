@@ -0,0 +1,168 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from tqdm import tqdm
+from pia_bench.event_alarm import EventDetector, FRAME_INTERVAL
+from pia_bench.intervals import window_frame_lengths, covered_length
+from pia_bench.metric import metrics_from_counts, COUNT_NAMES
+from pia_bench.vector_loader import VectorLoader, list_vector_files
+from pia_bench.label_store import LabelStore, clip_runs, EMPTY_RUNS
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+
+class ThresholdSweep:
+    """
+    이벤트별 (top_candidates, alert_threshold) 조합을 한 번에 평가하는 스윕 엔진입니다.
+
+    유사도 행렬은 (모델, 프롬프트 셋)마다 한 번만 계산해 메모리에 두고,
+    그리드 평가는 알람 CSV/메트릭 파일 없이 벡터 연산으로 수행합니다.
+    각 윈도우가 담당하는 프레임 수와 그 중 정답 프레임 수를 미리 구해두므로
+    그리드 점마다 프레임 확장 없이 누적 혼동행렬(accumulated_metrics와 동일)을 얻습니다.
+
+    Example:
+        >>> detector = EventDetector(config_path, model_name, token)
+        >>> sweep = ThresholdSweep(detector, pia_benchmark.vector_video_path, pia_benchmark.dataset_path)
+        >>> results = sweep.run({"falldown": {"top_candidates": [1, 2, 3], "alert_threshold": [1, 2]}})
+        >>> sweep.best(results, metric="f1")
+    """
+
+    def __init__(self, detector: EventDetector, vector_base_dir: str, label_base_dir: str):
+        self.detector = detector
+        self.engine = detector.alarm_engine
+        self.vector_base_dir = vector_base_dir
+        self.label_base_dir = label_base_dir
+        self._videos: Optional[List[Dict]] = None
+
+    def load(self) -> List[Dict]:
+        """비디오별 유사도 행렬, 윈도우 프레임 수, 윈도우별 정답 프레임 수를 한 번만 계산"""
+        if self._videos is not None:
+            return self._videos
+
+        vector_files = list_vector_files(self.vector_base_dir)
+        loader = VectorLoader(vector_files, should_load=self.detector.needs_vector)
+        label_store = LabelStore.load(self.label_base_dir) if LabelStore.exists(self.label_base_dir) else None
+
+        self._videos = []
+        for vector_file, video_vector in tqdm(loader, total=len(loader), desc="Loading similarity"):
+            category, video_name = vector_file.category, vector_file.video_name
+            key = (category, video_name)
+            if label_store is not None and key in label_store:
+                total_frames = label_store.total_frames(*key)
+                label_runs = {event: label_store.get_runs(category, video_name, event) for event in self.engine.events}
+            else:
+                label_path = os.path.join(self.label_base_dir, category, f"{video_name}.json")
+                if not os.path.exists(label_path):
+                    logger.warning(f"Warning: Label file not found for {video_name}")
+                    continue
+                with open(label_path, 'r') as f:
+                    label_data = json.load(f)
+                total_frames = label_data['video_info']['total_frame']
+                runs = clip_runs(label_data, total_frames)
+                label_runs = {event: runs.get(event, EMPTY_RUNS) for event in self.engine.events}
+
+            sim_matrix = self.detector.similarity(vector_file.path, video_vector)
+            lengths = window_frame_lengths(len(sim_matrix), total_frames, FRAME_INTERVAL)
+            bounds = np.concatenate(([0], np.cumsum(lengths)))
+
+            # 윈도우별 이벤트 정답 프레임 수 (windows, events)
+            positives = np.zeros((len(sim_matrix), len(self.engine.events)), dtype=np.int64)
+            for event_idx, event in enumerate(self.engine.events):
+                starts, ends = label_runs[event]
+                positives[:, event_idx] = np.diff(covered_length(starts, ends, bounds))
+
+            self._videos.append({
+                'category': category,
+                'video_name': video_name,
+                'sim_matrix': sim_matrix,
+                'lengths': lengths,
+                'positives': positives,
+                'total_frames': total_frames,
+            })
+        return self._videos
+
+    def _default_grid(self, event_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """프롬프트 수 범위 전체 (top_k: 1..n, threshold: 1..n)"""
+        num_prompts = len(self.engine.indices[event_idx])
+        values = np.arange(1, num_prompts + 1)
+        return values, values
+
+    def run(self, grid: Optional[Dict[str, Dict[str, List[int]]]] = None) -> pd.DataFrame:
+        """
+        이벤트별 (top_k, threshold) 그리드의 누적 혼동행렬과 성능 지표를 계산합니다.
+
+        Args:
+            grid: {event: {"top_candidates": [...], "alert_threshold": [...]}}
+                지정하지 않은 이벤트는 가능한 전체 범위를 평가
+
+        Returns:
+            pd.DataFrame: event, top_candidates, alert_threshold, tp/tn/fp/fn 및 config.ALL_METRICS 컬럼
+        """
+        grid = grid or {}
+        videos = self.load()
+        rows = []
+        for event_idx, event in enumerate(self.engine.events):
+            top_ks, thresholds = self._default_grid(event_idx)
+            if event in grid:
+                top_ks = np.asarray(grid[event].get('top_candidates', top_ks))
+                thresholds = np.asarray(grid[event].get('alert_threshold', thresholds))
+
+            indices = self.engine.indices[event_idx]
+            mask = self.engine.abnormal_masks[event_idx]
+            # (top_k, threshold, 4) 누적 [tp, tn, fp, fn]
+            counts = np.zeros((len(top_ks), len(thresholds), 4), dtype=np.int64)
+            for video in videos:
+                # 점수 내림차순 정렬 후 abnormal 누적 개수 -> 모든 top_k의 abnormal 개수를 한 번에 얻음
+                order = self.engine.rank(video['sim_matrix'][:, indices], len(indices))
+                cumulative = np.concatenate((np.zeros((len(order), 1), dtype=np.int64),
+                                             np.cumsum(mask[order], axis=1)), axis=1)
+                abnormal = cumulative[:, np.clip(top_ks, 0, len(indices))]           # (windows, K)
+                alarms = abnormal[:, :, None] >= thresholds[None, None, :]         # (windows, K, T)
+
+                positives = video['positives'][:, event_idx]
+                tp = np.einsum('w,wkt->kt', positives, alarms)
+                predicted = np.einsum('w,wkt->kt', video['lengths'], alarms)
+                fp = predicted - tp
+                fn = positives.sum() - tp
+                tn = video['total_frames'] - tp - fp - fn
+                counts += np.stack([tp, tn, fp, fn], axis=-1)
+
+            metrics = metrics_from_counts(counts)
+            for k_idx, top_k in enumerate(top_ks):
+                for t_idx, threshold in enumerate(thresholds):
+                    row = {'event': event, 'top_candidates': int(top_k), 'alert_threshold': int(threshold)}
+                    for name, values in metrics.items():
+                        value = values[k_idx, t_idx]
+                        row[name] = int(value) if name in COUNT_NAMES else float(value)
+                    rows.append(row)
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def best(results: pd.DataFrame, metric: str = 'f1') -> Dict[str, Dict[str, int]]:
+        """이벤트별로 metric이 가장 높은 (top_candidates, alert_threshold) 반환"""
+        best = {}
+        for event, group in results.groupby('event', sort=False):
+            row = group.loc[group[metric].idxmax()]
+            best[event] = {'top_candidates': int(row['top_candidates']),
+                           'alert_threshold': int(row['alert_threshold'])}
+        return best
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from pia_bench.bench_set import PiaBenchMarkSet
+    load_dotenv()
+
+    access_token = os.getenv("ACCESS_TOKEN")
+    model_name = "T2V_CLIP4CLIP_MSRVTT"
+    benchmark_path = "/home/jungseoik/data/Abnormal_situation_leader_board/assets/PIA"
+    cfg_target_path = "/home/jungseoik/data/Abnormal_situation_leader_board/assets/PIA/CFG/topk.json"
+
+    pia_benchmark = PiaBenchMarkSet(benchmark_path, model_name=model_name, cfg_target_path=cfg_target_path, token=access_token)
+    detector = EventDetector(config_path=cfg_target_path, model_name=model_name, token=access_token)
+    sweep = ThresholdSweep(detector, pia_benchmark.vector_video_path, pia_benchmark.dataset_path)
+    results = sweep.run()
+    results.to_csv(os.path.join(pia_benchmark.metric_path, "threshold_sweep.csv"), index=False)
+    print(sweep.best(results, metric="f1"))
@@ -0,0 +1,70 @@
+import os
+import hashlib
+import numpy as np
+import torch
+from typing import Callable, List
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+
+class TextVectorCache:
+    """
+    프롬프트 문장 단위 텍스트 벡터 캐시입니다.
+
+    문장 벡터를 {cache_dir}/{hash}.npy 로 하나씩 저장하고 (hash는 모델 이름 + 문장),
+    CFG가 바뀌어도 이미 인코딩한 문장은 다시 계산하지 않습니다.
+    새 문장만 모아 한 번에 인코딩하므로 모든 문장이 캐시에 있으면 모델을 로드하지 않습니다.
+
+    Example:
+        >>> cache = TextVectorCache(pia_benchmark.vector_text_path, model_name)
+        >>> text_vectors = cache.get_text_vectors(sentences, macs.get_text_vector)
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        """
+        Args:
+            cache_dir: 텍스트 벡터 폴더 (models/{model}/vector/text)
+            model_name: 모델 이름
+        """
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, sentence: str) -> str:
+        key = hashlib.sha1(f"{self.model_name}:{sentence}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get_text_vectors(self, sentences: List[str], encode: Callable[[List[str]], object]) -> np.ndarray:
+        """
+        문장 순서대로 쌓은 텍스트 벡터 반환
+
+        Args:
+            sentences: 프롬프트 문장 목록
+            encode: 캐시에 없는 문장 목록을 인코딩하는 함수 (예: macs.get_text_vector)
+
+        Returns:
+            np.ndarray: (prompts, ...) 텍스트 벡터
+        """
+        vectors = {}
+        missing = []
+        for sentence in dict.fromkeys(sentences):
+            path = self._path(sentence)
+            if os.path.exists(path):
+                vectors[sentence] = np.load(path)
+            else:
+                missing.append(sentence)
+
+        if missing:
+            logger.info(f"Encoding {len(missing)}/{len(vectors) + len(missing)} prompt sentences not in text cache")
+            encoded = encode(missing)
+            if isinstance(encoded, torch.Tensor):
+                encoded = encoded.detach().cpu().numpy()
+            for sentence, vector in zip(missing, np.asarray(encoded)):
+                path = self._path(sentence)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, vector)
+                os.replace(tmp_path, path)
+                vectors[sentence] = vector
+
+        return np.stack([vectors[sentence] for sentence in sentences])
@@ -0,0 +1,154 @@
+import queue
+import threading
+import numpy as np
+import torch
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+from pia_bench.vector_shard import VectorShard, load_shard_vector, shard_vector_path, split_shard_path
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+PAGE_SIZE = 4096
+DEFAULT_PREFETCH = 2
+
+
+class VectorFile(NamedTuple):
+    category: str
+    video_name: str
+    path: str
+
+
+def list_vector_files(vector_base_dir: str) -> List[VectorFile]:
+    """
+    {vector_base_dir}/{category}/{video}.npy 비디오 벡터 파일 목록
+
+    Args:
+        vector_base_dir: 카테고리별 비디오 벡터 폴더 (models/{model}/vector/video)
+
+    Returns:
+        List[VectorFile]: (카테고리, 비디오 이름, 경로) 목록 (카테고리 순서대로)
+
+    Note:
+        벡터 샤드(vector_index.npz)가 있으면 인덱스 한 번만 읽어 샤드 항목을 가상 경로
+        ({vector_base_dir}/@shard/{category}/{video}.npy)로 포함합니다. 같은 비디오의 .npy 파일이 있으면 파일이 우선합니다.
+    """
+    files = {(category, video_name): VectorFile(category, video_name, path)
+             for category, video_name, path in VectorShard.loose_files(vector_base_dir)}
+    if VectorShard.exists(vector_base_dir):
+        for category, video_name in VectorShard.load(vector_base_dir).keys():
+            files.setdefault((category, video_name),
+                             VectorFile(category, video_name, shard_vector_path(vector_base_dir, category, video_name)))
+    # 카테고리별로 모음 (카테고리는 처음 나온 순서 유지)
+    category_order = {category: idx for idx, category in enumerate(dict.fromkeys(key[0] for key in files))}
+    return sorted(files.values(), key=lambda vector_file: category_order[vector_file.category])
+
+
+def load_vector(path: str, mmap: bool = True) -> np.ndarray:
+    """
+    비디오 벡터 로드
+
+    mmap 사용 시 copy-on-write 모드로 열어 쓰기 가능한 배열을 반환하므로
+    torch.from_numpy로 복사 없이 텐서를 만들 수 있습니다.
+    샤드 가상 경로는 샤드 데이터 파일 mmap의 슬라이스를 반환합니다.
+    """
+    if split_shard_path(path) is not None:
+        array = load_shard_vector(path)
+        return array if mmap else np.array(array)
+    return np.load(path, mmap_mode='c' if mmap else None)
+
+
+def warm_pages(array: np.ndarray):
+    """mmap 배열의 모든 페이지를 한 번씩 읽어 페이지 캐시에 올림 (NAS 지연을 미리 소모)"""
+    if isinstance(array, np.memmap) and array.size:
+        np.frombuffer(array, dtype=np.uint8)[::PAGE_SIZE].sum()
+
+
+def to_tensor(array: np.ndarray, device: str = "cpu") -> torch.Tensor:
+    """복사 없이 CPU 텐서로 변환 후 장치로 이동 (CPU면 추가 복사 없음)"""
+    if not array.flags.writeable:
+        array = np.array(array)
+    return torch.from_numpy(array).to(device)
+
+
+class VectorLoader:
+    """
+    비디오 벡터를 백그라운드 스레드에서 미리 읽어오는 로더입니다.
+
+    현재 비디오를 계산하는 동안 다음 prefetch개 비디오의 벡터를 mmap으로 열고 페이지를 읽어두어
+    NAS 읽기 지연을 계산과 겹칩니다. 큐 크기가 prefetch로 제한되므로 메모리에는
+    최대 (prefetch + 1)개 비디오만 올라갑니다.
+
+    Example:
+        >>> loader = VectorLoader(list_vector_files(vector_base_dir), prefetch=2)
+        >>> for vector_file, video_vector in loader:
+        ...     sim_matrix = detector._compute_similarity_matrix(video_vector)
+    """
+
+    _DONE = object()
+
+    def __init__(self, files: List[VectorFile], prefetch: int = DEFAULT_PREFETCH, mmap: bool = True,
+                 should_load: Optional[Callable[[VectorFile], bool]] = None):
+        """
+        Args:
+            files: 읽을 벡터 파일 목록
+            prefetch: 미리 읽어둘 비디오 수 (0이면 백그라운드 스레드 없이 순차 로드)
+            mmap: mmap으로 읽을지 여부
+            should_load: False를 반환한 파일은 읽지 않고 None을 전달 (예: 유사도 캐시에 있는 비디오)
+        """
+        self.files = files
+        self.prefetch = prefetch
+        self.mmap = mmap
+        self.should_load = should_load
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def _load(self, vector_file: VectorFile) -> Optional[np.ndarray]:
+        if self.should_load is not None and not self.should_load(vector_file):
+            return None
+        array = load_vector(vector_file.path, mmap=self.mmap)
+        warm_pages(array)
+        return array
+
+    def __iter__(self) -> Iterator[Tuple[VectorFile, Optional[np.ndarray]]]:
+        if self.prefetch <= 0:
+            for vector_file in self.files:
+                yield vector_file, self._load(vector_file)
+            return
+
+        buffer = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def _put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _worker():
+            for vector_file in self.files:
+                try:
+                    item = (vector_file, self._load(vector_file), None)
+                except Exception as e:
+                    item = (vector_file, None, e)
+                if not _put(item):
+                    return
+            _put(self._DONE)
+
+        thread = threading.Thread(target=_worker, name="vector-prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is self._DONE:
+                    break
+                vector_file, array, error = item
+                if error is not None:
+                    raise error
+                yield vector_file, array
+        finally:
+            # 소비가 중간에 끝나도 스레드가 큐에서 막히지 않도록 종료
+            stop.set()
+            thread.join()
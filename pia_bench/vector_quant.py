@@ -0,0 +1,203 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
+from tqdm import tqdm
+from pia_bench.vector_loader import load_vector
+from pia_bench.vector_shard import VectorShard
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+FLOAT16 = "float16"
+INT8 = "int8"
+STORAGE_MODES = (FLOAT16, INT8)
+# int8 벡터는 마지막 축 끝에 float32 scale 4바이트와 형식 표시 4바이트를 int8로 붙여 저장
+_SCALE_BYTES = np.dtype(np.float32).itemsize
+INT8_MARKER = np.frombuffer(b"PQ8\x01", dtype=np.int8)
+_TRAILER_BYTES = _SCALE_BYTES + len(INT8_MARKER)
+
+
+def quantize(vector: np.ndarray, mode: str) -> np.ndarray:
+    """
+    비디오 벡터를 저장용 정밀도로 변환
+
+    Args:
+        vector: (windows, ..., dim) 실수 벡터
+        mode: "float16" 또는 "int8"
+
+    Returns:
+        np.ndarray: float16은 같은 shape, int8은 (windows, ..., dim + 8)
+            (마지막 축 벡터마다 대칭 scale = max|x| / 127을 구해 round(x / scale)로 저장하고,
+            scale(float32)의 바이트와 INT8_MARKER를 마지막 8개 원소에 붙임)
+
+    Raises:
+        ValueError: 지원하지 않는 mode
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    if mode == FLOAT16:
+        return vector.astype(np.float16)
+    if mode != INT8:
+        raise ValueError(f"Unknown vector storage mode '{mode}', expected one of {STORAGE_MODES}")
+    scale = np.abs(vector).max(axis=-1, keepdims=True) / 127
+    scale[scale == 0] = 1
+    packed = np.empty(vector.shape[:-1] + (vector.shape[-1] + _TRAILER_BYTES,), dtype=np.int8)
+    packed[..., :-_TRAILER_BYTES] = np.round(vector / scale)
+    packed[..., -_TRAILER_BYTES:-len(INT8_MARKER)] = scale.astype(np.float32).view(np.int8)
+    packed[..., -len(INT8_MARKER):] = INT8_MARKER
+    return packed
+
+
+def _is_int8_packed(vector: np.ndarray) -> bool:
+    """quantize(mode="int8")로 저장된 벡터인지 (모든 벡터 끝에 INT8_MARKER가 있는지) 확인"""
+    return (vector.dtype == np.int8 and vector.shape[-1] > _TRAILER_BYTES
+            and bool(np.all(vector[..., -len(INT8_MARKER):] == INT8_MARKER)))
+
+
+def dequantize(vector: np.ndarray) -> np.ndarray:
+    """
+    저장된 벡터를 float32로 복원 (float32는 복사 없이 그대로 반환)
+
+    Raises:
+        ValueError: int8 벡터 끝에 INT8_MARKER가 없는 경우 (quantize로 저장되지 않은 int8 벡터)
+    """
+    if vector.dtype == np.int8:
+        if not _is_int8_packed(vector):
+            raise ValueError("int8 vector has no quantization marker; store int8 vectors with quantize(mode='int8')")
+        scale = np.ascontiguousarray(vector[..., -_TRAILER_BYTES:-len(INT8_MARKER)]).view(np.float32)
+        restored = vector[..., :-_TRAILER_BYTES].astype(np.float32)
+        restored *= scale
+        return restored
+    return vector.astype(np.float32, copy=False)
+
+
+def storage_mode(vector: np.ndarray) -> Optional[str]:
+    """저장 정밀도 ("float16", "int8", 원본이면 None)"""
+    if _is_int8_packed(vector):
+        return INT8
+    if vector.dtype == np.float16:
+        return FLOAT16
+    return None
+
+
+def quantize_vector_file(path: str, mode: str) -> int:
+    """
+    .npy 벡터 파일을 저장 정밀도로 다시 씀 (임시 파일에 쓴 뒤 교체, 이미 같은 정밀도면 건너뜀)
+
+    Returns:
+        int: 줄어든 바이트 수
+    """
+    vector = np.load(path, mmap_mode='r')
+    if storage_mode(vector) == mode:
+        return 0
+    before = os.path.getsize(path)
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, quantize(dequantize(vector), mode))
+    del vector
+    os.replace(tmp_path, path)
+    return before - os.path.getsize(path)
+
+
+def quantize_vectors(vector_base_dir: str, mode: str) -> int:
+    """
+    벡터 폴더의 모든 .npy와 벡터 샤드 항목을 저장 정밀도로 변환
+
+    Note:
+        샤드 항목은 변환한 벡터를 새로 추가한 뒤 compact로 이전 공간을 회수합니다.
+        파일/항목 지문이 바뀌므로 유사도 캐시는 자연히 다시 계산됩니다.
+
+    Returns:
+        int: 줄어든 바이트 수
+    """
+    saved = 0
+    for _, _, path in VectorShard.loose_files(vector_base_dir):
+        saved += quantize_vector_file(path, mode)
+    if VectorShard.exists(vector_base_dir):
+        shard = VectorShard.load(vector_base_dir)
+        keys = [key for key in shard.keys() if storage_mode(shard.get(*key)) != mode]
+        if keys:
+            shard.append((category, video_name, quantize(dequantize(shard.get(category, video_name)), mode))
+                         for category, video_name in keys)
+            saved += shard.compact()
+    logger.info(f"Stored vectors in {vector_base_dir} as {mode}: saved {saved} bytes")
+    return saved
+
+
+def quantization_report(detector, vector_files: Sequence, modes: Sequence[str] = STORAGE_MODES) -> pd.DataFrame:
+    """
+    저장 정밀도별로 원본 대비 유사도/알람이 얼마나 바뀌는지 비교
+
+    원본 벡터와 quantize -> 저장 -> dequantize를 거친 벡터로 각각 유사도와 알람을 계산합니다
+    (유사도 캐시는 사용하지 않음).
+
+    Args:
+        detector: EventDetector (텍스트 벡터, 유사도 계산, 알람 엔진 사용)
+        vector_files: list_vector_files 결과 (원본 정밀도 벡터)
+        modes: 비교할 저장 정밀도 목록
+
+    Returns:
+        pd.DataFrame: mode, event별 행
+            - windows: 전체 윈도우 수
+            - changed_windows: 알람이 바뀐 윈도우 수 (changed_ratio는 비율)
+            - added / removed: 원본에 없던 알람 / 사라진 알람 윈도우 수
+            - videos_changed: 알람이 하나라도 바뀐 비디오 수
+            - max_score_diff: 최대 유사도 차이 (전체 프롬프트)
+            - bytes_ratio: 원본 대비 저장 크기 비율
+    """
+    events = detector.alarm_engine.events
+    stats = {(mode, event): {'windows': 0, 'changed_windows': 0, 'added': 0, 'removed': 0, 'videos_changed': 0}
+             for mode in modes for event in events}
+    max_diff = {mode: 0.0 for mode in modes}
+    stored_bytes = {mode: 0 for mode in modes}
+    original_bytes = 0
+
+    for vector_file in tqdm(vector_files, desc="Comparing vector precision"):
+        vector = dequantize(load_vector(vector_file.path))
+        original_bytes += vector.nbytes
+        sim_full = detector._compute_similarity_matrix(vector)
+        alarms_full = detector.alarm_engine.compute(sim_full)
+        for mode in modes:
+            stored = quantize(vector, mode)
+            stored_bytes[mode] += stored.nbytes
+            sim_quant = detector._compute_similarity_matrix(stored)
+            max_diff[mode] = max(max_diff[mode], float(np.abs(sim_quant - sim_full).max(initial=0.0)))
+            alarms_quant = detector.alarm_engine.compute(sim_quant)
+            for event_idx, event in enumerate(events):
+                full, quant = alarms_full[:, event_idx], alarms_quant[:, event_idx]
+                row = stats[(mode, event)]
+                row['windows'] += len(full)
+                row['added'] += int(np.count_nonzero((quant == 1) & (full == 0)))
+                row['removed'] += int(np.count_nonzero((quant == 0) & (full == 1)))
+                changed = int(np.count_nonzero(quant != full))
+                row['changed_windows'] += changed
+                row['videos_changed'] += int(changed > 0)
+
+    rows: List[dict] = []
+    for (mode, event), row in stats.items():
+        rows.append({
+            'mode': mode,
+            'event': event,
+            **row,
+            'changed_ratio': row['changed_windows'] / row['windows'] if row['windows'] else 0.0,
+            'max_score_diff': max_diff[mode],
+            'bytes_ratio': stored_bytes[mode] / original_bytes if original_bytes else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from pia_bench.bench_set import PiaBenchMarkSet
+    from pia_bench.event_alarm import EventDetector
+    from pia_bench.vector_loader import list_vector_files
+    load_dotenv()
+
+    access_token = os.getenv("ACCESS_TOKEN")
+    model_name = "T2V_CLIP4CLIP_MSRVTT"
+    benchmark_path = "/home/jungseoik/data/Abnormal_situation_leader_board/assets/PIA"
+    cfg_target_path = "/home/jungseoik/data/Abnormal_situation_leader_board/assets/PIA/CFG/topk.json"
+
+    pia_benchmark = PiaBenchMarkSet(benchmark_path, model_name=model_name, cfg_target_path=cfg_target_path, token=access_token)
+    detector = EventDetector(config_path=cfg_target_path, model_name=model_name, token=access_token,
+                             text_cache_dir=pia_benchmark.vector_text_path)
+    report = quantization_report(detector, list_vector_files(pia_benchmark.vector_video_path))
+    print(report.to_string(index=False))
@@ -0,0 +1,299 @@
+import os
+import re
+import time
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from utils.except_dir import cust_listdir
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+VECTOR_INDEX_FILE = "vector_index.npz"
+SHARD_MARK = "@shard"
+# 항목 시작 위치 정렬 (어떤 dtype으로도 view 가능하도록)
+SHARD_ALIGN = 64
+_DATA_FILE = "vectors.{}.bin"
+_DATA_FILE_PATTERN = re.compile(r"vectors\.(\d+)\.bin$")
+
+
+class ShardEntry(NamedTuple):
+    offset: int         # 데이터 파일 내 시작 바이트
+    nbytes: int
+    dtype: str          # numpy dtype 문자열 (예: '<f4')
+    shape: Tuple[int, ...]  # (windows, ...) 벡터 shape
+    written_ns: int     # 추가된 시각 (압축해도 유지되어 유사도 캐시 키로 사용)
+
+
+def shard_vector_path(shard_dir: str, category: str, video_name: str) -> str:
+    """샤드 항목의 가상 벡터 경로 ({shard_dir}/@shard/{category}/{video}.npy)"""
+    return os.path.join(shard_dir, SHARD_MARK, category, f"{video_name}.npy")
+
+
+def split_shard_path(path: str) -> Optional[Tuple[str, str, str]]:
+    """가상 벡터 경로면 (shard_dir, category, video_name), 아니면 None"""
+    category_dir, file_name = os.path.split(path)
+    mark_dir, category = os.path.split(category_dir)
+    shard_dir, mark = os.path.split(mark_dir)
+    if mark != SHARD_MARK:
+        return None
+    return shard_dir, category, os.path.splitext(file_name)[0]
+
+
+def _align(offset: int) -> int:
+    return -(-offset // SHARD_ALIGN) * SHARD_ALIGN
+
+
+class VectorShard:
+    """
+    비디오별 .npy 벡터를 하나의 데이터 파일과 인덱스로 합친 벡터 샤드입니다.
+
+    모든 벡터를 vectors.{generation}.bin 하나에 이어 붙이고, vector_index.npz에
+    (카테고리, 비디오, 시작 위치, 크기, 윈도우 수, dtype, shape)를 기록합니다.
+    데이터 파일을 한 번 mmap한 뒤 비디오 벡터는 복사 없는 슬라이스로 반환합니다.
+
+    - append: 새 벡터를 파일 끝에 추가 (같은 비디오는 새 항목으로 교체되고 이전 바이트는 압축 전까지 남음)
+    - remove: 인덱스에서만 삭제
+    - compact: 살아있는 항목만 다음 generation 파일로 다시 쓰고 이전 파일 삭제
+    인덱스는 임시 파일에 쓴 뒤 교체하므로 중단되어도 이전 인덱스와 데이터는 그대로 유효합니다.
+
+    Note:
+        쓰기는 한 프로세스에서만 한다고 가정합니다. 읽는 쪽은 인덱스가 바뀌면 open_shard로 다시 엽니다.
+
+    저장 구조 ({shard_dir}/vector_index.npz):
+        - data_file: 현재 데이터 파일 이름
+        - categories, videos, offsets, nbytes, windows, dtypes, written_ns: (V,) 비디오별 정보
+        - item_shapes: (V, K) 윈도우 축을 뺀 나머지 shape (-1로 채움)
+
+    Example:
+        >>> shard = VectorShard.consolidate(pia_benchmark.vector_video_path)
+        >>> video_vector = shard.get("fire", "video1")
+        >>> shard.compact()
+    """
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = shard_dir
+        self.data_file: Optional[str] = None
+        self._entries: Dict[Tuple[str, str], ShardEntry] = {}
+        self._data: Optional[np.memmap] = None
+
+    @staticmethod
+    def exists(shard_dir: str) -> bool:
+        return os.path.isfile(os.path.join(shard_dir, VECTOR_INDEX_FILE))
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """(카테고리, 비디오 이름) 목록 (인덱스 순서)"""
+        return list(self._entries)
+
+    def entry(self, category: str, video_name: str) -> ShardEntry:
+        return self._entries[(category, video_name)]
+
+    def windows(self, category: str, video_name: str) -> int:
+        return self._entries[(category, video_name)].shape[0]
+
+    @property
+    def data_path(self) -> Optional[str]:
+        return os.path.join(self.shard_dir, self.data_file) if self.data_file else None
+
+    @property
+    def dead_bytes(self) -> int:
+        """압축으로 회수할 수 있는 바이트 수 (교체/삭제된 항목과 정렬 여백)"""
+        if self.data_path is None or not os.path.exists(self.data_path):
+            return 0
+        return os.path.getsize(self.data_path) - sum(entry.nbytes for entry in self._entries.values())
+
+    def get(self, category: str, video_name: str) -> np.ndarray:
+        """비디오 벡터를 데이터 파일 mmap의 슬라이스로 반환 (copy-on-write라 torch.from_numpy 가능)"""
+        entry = self._entries[(category, video_name)]
+        if self._data is None:
+            self._data = np.memmap(self.data_path, dtype=np.uint8, mode='c')
+        return self._data[entry.offset:entry.offset + entry.nbytes].view(entry.dtype).reshape(entry.shape)
+
+    def _generation(self) -> int:
+        match = _DATA_FILE_PATTERN.match(self.data_file or "")
+        return int(match.group(1)) if match else -1
+
+    def append(self, vectors: Iterable[Tuple[str, str, np.ndarray]]) -> int:
+        """
+        벡터를 데이터 파일 끝에 추가하고 인덱스를 저장
+
+        Args:
+            vectors: (카테고리, 비디오 이름, 벡터) 목록 (같은 비디오가 이미 있으면 교체)
+
+        Returns:
+            int: 추가한 비디오 수
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        if self.data_file is None:
+            self.data_file = _DATA_FILE.format(0)
+        count = 0
+        with open(self.data_path, 'ab') as f:
+            end = f.seek(0, os.SEEK_END)
+            for category, video_name, array in vectors:
+                array = np.ascontiguousarray(array)
+                offset = _align(end)
+                f.write(b'\0' * (offset - end))
+                f.write(array.reshape(-1).view(np.uint8))
+                end = offset + array.nbytes
+                self._entries[(category, video_name)] = ShardEntry(
+                    offset, array.nbytes, array.dtype.str, tuple(array.shape), time.time_ns())
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        # 파일 크기가 바뀌었으므로 다음 get에서 다시 mmap
+        self._data = None
+        if count:
+            self.save_index()
+        return count
+
+    def remove(self, keys: Iterable[Tuple[str, str]]) -> int:
+        """인덱스에서 항목 삭제 (데이터는 compact 때 회수)"""
+        removed = sum(1 for key in keys if self._entries.pop(key, None) is not None)
+        if removed:
+            self.save_index()
+        return removed
+
+    def compact(self) -> int:
+        """
+        살아있는 항목만 인덱스 순서대로 새 데이터 파일에 다시 쓰고 이전 파일 삭제
+
+        Returns:
+            int: 회수한 바이트 수
+        """
+        old_path = self.data_path
+        old_size = os.path.getsize(old_path) if old_path and os.path.exists(old_path) else 0
+        new_file = _DATA_FILE.format(self._generation() + 1)
+        entries = {}
+        end = 0
+        with open(os.path.join(self.shard_dir, new_file), 'wb') as f:
+            for key in self._entries:
+                array = self.get(*key)
+                offset = _align(end)
+                f.write(b'\0' * (offset - end))
+                f.write(array.reshape(-1).view(np.uint8))
+                end = offset + array.nbytes
+                entries[key] = self._entries[key]._replace(offset=offset)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._entries = entries
+        self.data_file = new_file
+        self._data = None
+        self.save_index()
+        if old_path and os.path.exists(old_path):
+            os.remove(old_path)
+        reclaimed = old_size - end
+        logger.info(f"Compacted vector shard {self.shard_dir}: {len(entries)} videos, reclaimed {reclaimed} bytes")
+        return reclaimed
+
+    def save_index(self) -> str:
+        keys = list(self._entries)
+        entries = [self._entries[key] for key in keys]
+        item_ndim = max((len(entry.shape) - 1 for entry in entries), default=0)
+        item_shapes = np.full((len(entries), item_ndim), -1, dtype=np.int64)
+        for idx, entry in enumerate(entries):
+            item_shapes[idx, :len(entry.shape) - 1] = entry.shape[1:]
+
+        save_path = os.path.join(self.shard_dir, VECTOR_INDEX_FILE)
+        tmp_path = f"{save_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                data_file=np.array(self.data_file or ""),
+                categories=np.array([category for category, _ in keys]),
+                videos=np.array([video for _, video in keys]),
+                offsets=np.array([entry.offset for entry in entries], dtype=np.int64),
+                nbytes=np.array([entry.nbytes for entry in entries], dtype=np.int64),
+                windows=np.array([entry.shape[0] for entry in entries], dtype=np.int64),
+                dtypes=np.array([entry.dtype for entry in entries]),
+                item_shapes=item_shapes,
+                written_ns=np.array([entry.written_ns for entry in entries], dtype=np.int64),
+            )
+        os.replace(tmp_path, save_path)
+        return save_path
+
+    @classmethod
+    def load(cls, shard_dir: str) -> "VectorShard":
+        """인덱스 파일 하나만 읽어 복원 (데이터 파일은 처음 get할 때 mmap)"""
+        with np.load(os.path.join(shard_dir, VECTOR_INDEX_FILE)) as data:
+            arrays = {key: data[key] for key in data.files}
+
+        shard = cls(shard_dir)
+        shard.data_file = str(arrays['data_file']) or None
+        for idx, key in enumerate(zip(arrays['categories'].tolist(), arrays['videos'].tolist())):
+            item_shape = tuple(int(dim) for dim in arrays['item_shapes'][idx] if dim >= 0)
+            shard._entries[key] = ShardEntry(
+                offset=int(arrays['offsets'][idx]),
+                nbytes=int(arrays['nbytes'][idx]),
+                dtype=str(arrays['dtypes'][idx]),
+                shape=(int(arrays['windows'][idx]),) + item_shape,
+                written_ns=int(arrays['written_ns'][idx]),
+            )
+        return shard
+
+    @classmethod
+    def open_or_create(cls, shard_dir: str) -> "VectorShard":
+        """샤드가 있으면 읽고 없으면 빈 샤드 생성"""
+        return cls.load(shard_dir) if cls.exists(shard_dir) else cls(shard_dir)
+
+    @staticmethod
+    def loose_files(vector_base_dir: str) -> Iterator[Tuple[str, str, str]]:
+        """{vector_base_dir}/{category}/{video}.npy 개별 벡터 파일 (카테고리, 비디오 이름, 경로)"""
+        for category in cust_listdir(vector_base_dir):
+            category_path = os.path.join(vector_base_dir, category)
+            if not os.path.isdir(category_path) or category == SHARD_MARK:
+                continue
+            for file in cust_listdir(category_path):
+                if file.endswith('.npy'):
+                    yield category, os.path.splitext(file)[0], os.path.join(category_path, file)
+
+    @classmethod
+    def consolidate(cls, vector_base_dir: str, remove_files: bool = True) -> "VectorShard":
+        """
+        개별 .npy 벡터를 샤드에 추가 (새로 추출된 비디오만 추가하는 용도로 반복 실행 가능)
+
+        Args:
+            vector_base_dir: 카테고리별 비디오 벡터 폴더 (models/{model}/vector/video, 샤드도 이 폴더에 생성)
+            remove_files: 인덱스 저장 후 추가한 .npy 파일 삭제
+        """
+        shard = cls.open_or_create(vector_base_dir)
+        loose = list(cls.loose_files(vector_base_dir))
+        added = shard.append((category, video_name, np.load(path, mmap_mode='r'))
+                             for category, video_name, path in loose)
+        if remove_files:
+            for _, _, path in loose:
+                os.remove(path)
+        logger.info(f"Consolidated {added} vector files into {vector_base_dir} ({len(shard)} videos)")
+        return shard
+
+
+# 프로세스 내에서 공유하는 읽기용 샤드 (abspath -> (인덱스 mtime_ns, 샤드))
+_open_shards: Dict[str, Tuple[int, VectorShard]] = {}
+
+
+def open_shard(shard_dir: str) -> VectorShard:
+    """읽기용 샤드를 캐시해서 반환 (인덱스 파일이 바뀌면 다시 읽음)"""
+    key = os.path.abspath(shard_dir)
+    mtime_ns = os.stat(os.path.join(key, VECTOR_INDEX_FILE)).st_mtime_ns
+    cached = _open_shards.get(key)
+    if cached is None or cached[0] != mtime_ns:
+        cached = (mtime_ns, VectorShard.load(key))
+        _open_shards[key] = cached
+    return cached[1]
+
+
+def load_shard_vector(path: str) -> np.ndarray:
+    """가상 벡터 경로의 샤드 슬라이스"""
+    shard_dir, category, video_name = split_shard_path(path)
+    return open_shard(shard_dir).get(category, video_name)
+
+
+def shard_fingerprint(path: str) -> str:
+    """가상 벡터 경로의 지문 (압축해도 바뀌지 않도록 크기와 추가 시각 사용)"""
+    shard_dir, category, video_name = split_shard_path(path)
+    entry = open_shard(shard_dir).entry(category, video_name)
+    return f"{os.path.abspath(path)}:{entry.nbytes}:{entry.written_ns}"
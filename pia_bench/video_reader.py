@@ -0,0 +1,140 @@
+import cv2
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+GRAB = "grab"
+SEEK = "seek"
+DEFAULT_FRAME_SIZE = (224, 224)
+# 샘플 간격이 이보다 크면 키프레임 탐색(seek)이 순차 grab보다 유리
+SEEK_MIN_STRIDE = 60
+
+
+def tile_boxes(width: int, height: int, tile_size: Union[int, Tuple[int, int], List[int]]) -> List[Tuple[int, int, int, int]]:
+    """
+    프레임을 tile_size 크기 타일로 덮는 (x, y, w, h) 목록 (행 우선 순서)
+
+    Note:
+        타일 수는 ceil(width / tile_w) × ceil(height / tile_h)이며, 나누어떨어지지 않으면
+        패딩 대신 타일 위치를 균등하게 배치해 이웃 타일이 조금씩 겹치도록 합니다.
+
+    Args:
+        width: 프레임 너비
+        height: 프레임 높이
+        tile_size: 타일 한 변 길이 (원본 픽셀) 또는 [tile_w, tile_h]
+    """
+    tile_w, tile_h = (tile_size, tile_size) if np.isscalar(tile_size) else tuple(tile_size)
+    tile_w, tile_h = min(int(tile_w), width), min(int(tile_h), height)
+    xs = np.linspace(0, width - tile_w, -(-width // tile_w)).round().astype(int)
+    ys = np.linspace(0, height - tile_h, -(-height // tile_h)).round().astype(int)
+    return [(int(x), int(y), tile_w, tile_h) for y in ys for x in xs]
+
+
+class SampledFrameReader:
+    """
+    VIDEO_CFG.time_sampling 간격의 프레임만 꺼내는 비디오 리더입니다.
+
+    모든 프레임을 read()로 디코딩/색변환하는 대신, 건너뛸 프레임은 grab()만 호출하고
+    모델에 들어갈 프레임만 retrieve()한 뒤 바로 모델 입력 크기로 줄입니다.
+    샘플 간격이 GOP보다 충분히 크면 seek 모드로 키프레임부터 필요한 프레임까지만 디코딩합니다.
+    tile_size를 지정하면 원본 해상도 프레임을 타일로 나눈 뒤 타일마다 frame_size로 줄여 (tiles, H, W, 3)을 반환합니다.
+
+    Note:
+        OpenCV FFmpeg 백엔드는 저해상도 디코딩 옵션을 제공하지 않으므로
+        축소는 retrieve 직후 샘플 프레임에만 INTER_AREA로 수행합니다.
+
+    Example:
+        >>> reader = SampledFrameReader.from_config("video.mp4", config["VIDEO_CFG"])
+        >>> for frame_idx, frame in reader:
+        ...     batch.append(frame)
+    """
+
+    def __init__(self, video_path: str, time_sampling: int = 15,
+                 frame_size: Optional[Tuple[int, int]] = DEFAULT_FRAME_SIZE, mode: Optional[str] = None,
+                 rgb: bool = True, tile_size: Optional[Union[int, Tuple[int, int]]] = None):
+        """
+        Args:
+            video_path: 비디오 경로
+            time_sampling: 샘플링 간격 (프레임)
+            frame_size: (width, height) 출력 크기 (None이면 원본 크기)
+            mode: "grab" 또는 "seek" (기본값은 time_sampling에 따라 자동 선택)
+            rgb: True면 RGB, False면 OpenCV 기본 BGR로 반환
+            tile_size: 타일 크기 (원본 픽셀, None이면 타일링하지 않음)
+        """
+        self.video_path = video_path
+        self.time_sampling = max(1, int(time_sampling))
+        self.frame_size = tuple(frame_size) if frame_size else None
+        self.mode = mode or (SEEK if self.time_sampling >= SEEK_MIN_STRIDE else GRAB)
+        self.rgb = rgb
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video: {video_path}")
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        self.tiles = tile_boxes(width, height, tile_size) if tile_size else None
+
+    @classmethod
+    def from_config(cls, video_path: str, video_cfg: Dict, **kwargs) -> "SampledFrameReader":
+        """CFG의 VIDEO_CFG로 생성 (tile_size가 있으면 타일링)"""
+        kwargs.setdefault('tile_size', video_cfg.get('tile_size'))
+        return cls(video_path, time_sampling=video_cfg.get('time_sampling', 15), **kwargs)
+
+    @property
+    def num_tiles(self) -> int:
+        """프레임당 타일 수 (타일링하지 않으면 1)"""
+        return len(self.tiles) if self.tiles else 1
+
+    def __len__(self) -> int:
+        return -(-self.total_frames // self.time_sampling)
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        if self.tiles:
+            return np.stack([self._convert(frame[y:y + h, x:x + w]) for x, y, w, h in self.tiles])
+        return self._convert(frame)
+
+    def _convert(self, frame: np.ndarray) -> np.ndarray:
+        if self.frame_size is not None and (frame.shape[1], frame.shape[0]) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+        if self.rgb:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return frame
+
+    def _iter_grab(self, cap: cv2.VideoCapture) -> Iterator[Tuple[int, np.ndarray]]:
+        frame_idx = 0
+        while cap.grab():
+            if frame_idx % self.time_sampling == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                yield frame_idx, self._prepare(frame)
+            frame_idx += 1
+
+    def _iter_seek(self, cap: cv2.VideoCapture) -> Iterator[Tuple[int, np.ndarray]]:
+        for frame_idx in range(0, self.total_frames, self.time_sampling):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame_idx, self._prepare(frame)
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """(원본 프레임 번호, 프레임) 순서대로 반환"""
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            yield from (self._iter_seek(cap) if self.mode == SEEK else self._iter_grab(cap))
+        finally:
+            cap.release()
+
+    def read_all(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(샘플 프레임 번호, (N, H, W, 3) 프레임 배열, 타일링 시 (N, tiles, H, W, 3))"""
+        indices, frames = [], []
+        for frame_idx, frame in self:
+            indices.append(frame_idx)
+            frames.append(frame)
+        if not frames:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 0, 0, 3), dtype=np.uint8)
+        return np.array(indices, dtype=np.int64), np.stack(frames)
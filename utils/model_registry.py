@@ -0,0 +1,120 @@
+import threading
+import types
+from collections import OrderedDict
+from typing import Optional, Tuple
+import torch
+from devmacs_core.devmacs_core import DevMACSCore
+import enviroments.config as config
+from utils.logger import custom_logger
+logger = custom_logger(__name__)
+
+
+# 모델 크기 추정 시 살펴볼 속성 깊이 (래퍼 객체 안의 torch 모듈까지 찾음)
+MAX_ESTIMATE_DEPTH = 6
+
+
+def estimate_model_bytes(model) -> int:
+    """
+    모델이 참조하는 torch 모듈/텐서의 파라미터와 버퍼 크기 합계
+
+    Note:
+        DevMACSCore 내부 구조에 의존하지 않도록 인스턴스 속성과 dict/list/tuple/set을
+        MAX_ESTIMATE_DEPTH 단계까지 따라가며 찾습니다 (같은 객체/텐서는 한 번만 셈).
+    """
+    total = 0
+    seen_tensors = set()
+    seen_objects = set()
+    stack = [(model, 0)]
+    while stack:
+        value, depth = stack.pop()
+        if id(value) in seen_objects:
+            continue
+        seen_objects.add(id(value))
+        if isinstance(value, torch.nn.Module):
+            tensors = list(value.parameters()) + list(value.buffers())
+        elif isinstance(value, torch.Tensor):
+            tensors = [value]
+        else:
+            tensors = []
+            if depth < MAX_ESTIMATE_DEPTH and not isinstance(value, (type, types.ModuleType, str, bytes)):
+                if isinstance(value, dict):
+                    children = value.values()
+                elif isinstance(value, (list, tuple, set, frozenset)):
+                    children = value
+                else:
+                    children = getattr(value, '__dict__', {}).values()
+                stack.extend((child, depth + 1) for child in children)
+        for tensor in tensors:
+            if id(tensor) not in seen_tensors:
+                seen_tensors.add(id(tensor))
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelRegistry:
+    """
+    프로세스 단위로 로드된 DevMACSCore 모델을 재사용하는 레지스트리입니다.
+
+    (repo_id, revision)별로 모델을 한 번만 역직렬화하고, 파이프라인 단계(벡터 추출, 알람 생성)와
+    MainLoop의 이후 작업들이 같은 모델을 그대로 사용합니다.
+    보관 중인 모델의 크기 합계가 memory_budget을 넘으면 가장 오래 사용하지 않은 모델부터 해제합니다.
+
+    Example:
+        >>> macs = get_model("PIA-SPACE-LAB/T2V_CLIP4CLIP_MSRVTT", token=access_token)
+    """
+
+    def __init__(self, memory_budget: int = config.MODEL_MEMORY_BUDGET):
+        """
+        Args:
+            memory_budget: 보관할 모델 크기 합계 상한 (bytes, 가장 최근 모델 하나는 항상 보관)
+        """
+        self.memory_budget = memory_budget
+        self._models: "OrderedDict[Tuple[str, Optional[str]], Tuple[DevMACSCore, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, repo_id: str, token: Optional[str] = None, revision: Optional[str] = None) -> DevMACSCore:
+        """캐시된 모델 반환 (없으면 허깅페이스에서 로드)"""
+        key = (repo_id, revision)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                logger.info(f"Reusing loaded model {repo_id}@{revision or 'main'}")
+                return self._models[key][0]
+
+            kwargs = {'revision': revision} if revision else {}
+            cuda_before = torch.cuda.memory_allocated() if torch.cuda.is_available() else 0
+            model = DevMACSCore.from_huggingface(token=token, repo_id=repo_id, **kwargs)
+            size = estimate_model_bytes(model)
+            if size == 0 and torch.cuda.is_available():
+                # 속성에서 텐서를 찾지 못하면 로드 전후 GPU 할당량 차이로 추정
+                size = max(0, torch.cuda.memory_allocated() - cuda_before)
+            if size == 0:
+                logger.warning(f"Could not estimate memory of model {repo_id}@{revision or 'main'}; "
+                               f"it does not count towards MODEL_MEMORY_BUDGET")
+            self._models[key] = (model, size)
+            logger.info(f"Loaded model {repo_id}@{revision or 'main'} ({size / 1024 ** 2:.1f} MB)")
+            self._evict()
+            return model
+
+    def _evict(self):
+        evicted = False
+        while len(self._models) > 1 and sum(size for _, size in self._models.values()) > self.memory_budget:
+            (repo_id, revision), _ = self._models.popitem(last=False)
+            logger.info(f"Evicted model {repo_id}@{revision or 'main'} from registry")
+            evicted = True
+        if evicted and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+
+_registry = ModelRegistry()
+
+
+def get_model(repo_id: str, token: Optional[str] = None, revision: Optional[str] = None) -> DevMACSCore:
+    """프로세스 공용 레지스트리에서 모델 반환"""
+    return _registry.get(repo_id, token=token, revision=revision)
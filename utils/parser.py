@@ -1,6 +1,12 @@
+import os
 import json
+import threading
+import numpy as np
+from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional, Any
 
+PROMPT_STATUSES = ('normal', 'abnormal')
+
 def load_config(config_path: str) -> Dict[str, Any]:
     """
     JSON 설정 파일을 읽어서 딕셔너리로 반환합니다.
@@ -22,6 +28,66 @@ def load_config(config_path: str) -> Dict[str, Any]:
     with open(config_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True)
+class CompiledPrompts:
+    """
+    PROMPT_CFG를 한 번 컴파일한 불변 배열 모음입니다.
+
+    Attributes:
+        sentences (Tuple[str, ...]): 전체 프롬프트 문장 (이벤트 순, 이벤트 내 normal -> abnormal 순)
+        events (Tuple[str, ...]): 이벤트 이름 목록
+        indices (Tuple[np.ndarray, ...]): 이벤트별 sentences(유사도 행렬 열)의 전역 인덱스
+        abnormal_masks (Tuple[np.ndarray, ...]): 이벤트별 프롬프트의 abnormal 여부
+        top_k (np.ndarray): 이벤트별 top_candidates
+        thresholds (np.ndarray): 이벤트별 alert_threshold
+    """
+    sentences: Tuple[str, ...]
+    events: Tuple[str, ...]
+    indices: Tuple[np.ndarray, ...]
+    abnormal_masks: Tuple[np.ndarray, ...]
+    top_k: np.ndarray
+    thresholds: np.ndarray
+
+
+def compile_prompt_config(config: Dict[str, Any]) -> CompiledPrompts:
+    """
+    설정 딕셔너리의 PROMPT_CFG를 CompiledPrompts로 컴파일합니다.
+
+    Args:
+        config (Dict[str, Any]): load_config로 읽은 설정
+
+    Returns:
+        CompiledPrompts: 이벤트별 인덱스가 전체 문장 목록 기준 오프셋으로 계산된 컴파일 결과
+    """
+    sentences, events, indices, masks, top_k, thresholds = [], [], [], [], [], []
+    for event_config in config.get('PROMPT_CFG', []):
+        prompts = event_config.get('prompts', {})
+        offset = len(sentences)
+        mask = []
+        for status in PROMPT_STATUSES:
+            for prompt in prompts.get(status, []):
+                sentences.append(prompt.get('sentence', ''))
+                mask.append(status == 'abnormal')
+        events.append(event_config['event'])
+        indices.append(_readonly(np.arange(offset, len(sentences), dtype=np.intp)))
+        masks.append(_readonly(np.array(mask, dtype=bool)))
+        top_k.append(event_config['top_candidates'])
+        thresholds.append(event_config['alert_threshold'])
+    return CompiledPrompts(
+        sentences=tuple(sentences),
+        events=tuple(events),
+        indices=tuple(indices),
+        abnormal_masks=tuple(masks),
+        top_k=_readonly(np.array(top_k, dtype=np.intp)),
+        thresholds=_readonly(np.array(thresholds)),
+    )
+
+
 class PromptManager:
     """
     프롬프트 설정을 관리하고 검색하는 클래스입니다.
@@ -55,6 +121,18 @@ class PromptManager:
         self.config = load_config(config_path)
         self.sentences, self.index_mapping = self._extract_all_sentences_with_index()
         self.reverse_mapping = self._create_reverse_mapping()
+        self._compiled: Optional[CompiledPrompts] = None
+
+    def compile(self) -> CompiledPrompts:
+        """
+        설정을 불변 배열로 컴파일합니다 (인스턴스당 한 번만 계산).
+
+        Returns:
+            CompiledPrompts: 문장 목록, 이벤트별 전역 인덱스, abnormal 마스크, top_k/threshold 벡터
+        """
+        if self._compiled is None:
+            self._compiled = compile_prompt_config(self.config)
+        return self._compiled
     
     def _extract_all_sentences_with_index(self) -> Tuple[List[str], Dict[Tuple[int, str, int], str]]:
         """
@@ -73,7 +151,7 @@ class PromptManager:
         
         for event_idx, event_config in enumerate(self.config.get('PROMPT_CFG', [])):
             prompts = event_config.get('prompts', {})
-            for status in ['normal', 'abnormal']:
+            for status in PROMPT_STATUSES:
                 for prompt_idx, prompt in enumerate(prompts.get(status, [])):
                     sentence = prompt.get('sentence', '')
                     sentences.append(sentence)
@@ -175,4 +253,35 @@ class PromptManager:
             List[str]: 설정에 포함된 모든 프롬프트 문장 리스트
             
         """
-        return self.sentences
\ No newline at end of file
+        return self.sentences
+
+
+_prompt_managers: Dict[str, Tuple[int, PromptManager]] = {}
+_prompt_managers_lock = threading.Lock()
+
+
+def get_prompt_manager(config_path: str) -> PromptManager:
+    """
+    CFG 경로별로 공유되는 PromptManager를 반환합니다.
+
+    파일 수정 시각이 바뀌면 다시 읽으므로, 같은 CFG를 쓰는 모든 소비자가
+    하나의 컴파일 결과를 공유합니다.
+
+    Args:
+        config_path (str): 프롬프트 설정 JSON 파일 경로
+
+    Returns:
+        PromptManager: 캐시된 (또는 새로 읽은) PromptManager
+
+    Example:
+        >>> compiled = get_prompt_manager("topk.json").compile()
+        >>> compiled.indices[0], compiled.top_k
+    """
+    key = os.path.abspath(config_path)
+    mtime = os.stat(key).st_mtime_ns
+    with _prompt_managers_lock:
+        cached = _prompt_managers.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, PromptManager(key))
+            _prompt_managers[key] = cached
+        return cached[1]